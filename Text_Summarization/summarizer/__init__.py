@@ -1,3 +1,22 @@
-from summarizer.bert import Summarizer, TransformerSummarizer
+import importlib
 
 __all__ = ["Summarizer", "TransformerSummarizer"]
+
+# The summarizers pull in torch and transformers, so they are only imported when first accessed.
+_LAZY_ATTRIBUTES = {
+    "Summarizer": "summarizer.bert",
+    "TransformerSummarizer": "summarizer.bert",
+}
+
+
+def __getattr__(name: str):
+    if name not in _LAZY_ATTRIBUTES:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+    value = getattr(importlib.import_module(_LAZY_ATTRIBUTES[name]), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
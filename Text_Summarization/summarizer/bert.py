@@ -1,20 +1,16 @@
 from functools import partial
-from typing import List, Optional, Union
-
-from transformers import (AlbertModel, AlbertTokenizer, BartModel, BigBirdModel, BigBirdTokenizer,
-                          BartTokenizer, BertModel, BertTokenizer,
-                          CamembertModel, CamembertTokenizer, CTRLModel,
-                          CTRLTokenizer, DistilBertModel, DistilBertTokenizer,
-                          GPT2Model, GPT2Tokenizer, LongformerModel,
-                          LongformerTokenizer, OpenAIGPTModel,
-                          OpenAIGPTTokenizer, PreTrainedModel,
-                          PreTrainedTokenizer, RobertaModel, RobertaTokenizer,
-                          TransfoXLModel, TransfoXLTokenizer, XLMModel,
-                          XLMTokenizer, XLNetModel, XLNetTokenizer)
+from typing import TYPE_CHECKING, List, Optional, Tuple, Type, Union
 
+from summarizer.document_session import DocumentSession
+from summarizer.projection import PCAProjection
 from summarizer.summary_processor import SummaryProcessor
 from summarizer.text_processors.sentence_handler import SentenceHandler
 from summarizer.transformer_embeddings.bert_embedding import BertEmbedding
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
+from summarizer.transformer_embeddings.model_registry import ModelRegistry
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedModel, PreTrainedTokenizer
 
 
 class BertSummarizer(SummaryProcessor):
@@ -23,14 +19,27 @@ class BertSummarizer(SummaryProcessor):
     def __init__(
         self,
         model: Optional[str] = 'bert-large-uncased',
-        custom_model: PreTrainedModel = None,
-        custom_tokenizer: PreTrainedTokenizer = None,
+        custom_model: 'PreTrainedModel' = None,
+        custom_tokenizer: 'PreTrainedTokenizer' = None,
         hidden: Union[List[int], int] = -2,
         reduce_option: str = 'mean',
-        sentence_handler: SentenceHandler = SentenceHandler(),
+        sentence_handler: SentenceHandler = None,
         random_state: int = 12345,
         hidden_concat: bool = False,
         gpu_id: int = 0,
+        batch_size: int = None,
+        max_tokens: int = None,
+        embedding_cache: EmbeddingCache = None,
+        pca_k: Union[int, str] = None,
+        projection: PCAProjection = None,
+        truncate_layers: bool = False,
+        quantize: bool = False,
+        quantize_check: List[str] = None,
+        backend: str = 'eager',
+        backend_path: str = None,
+        registry: ModelRegistry = None,
+        model_classes: Tuple[Union[str, Type['PreTrainedModel']], Union[str, Type['PreTrainedTokenizer']]] = None,
+        tokenizer_name: str = None,
     ):
         """
         This is the parent Bert Summarizer model. New methods should implement this class.
@@ -41,14 +50,66 @@ class BertSummarizer(SummaryProcessor):
         :param hidden: This signifies which layer(s) of the BERT model you would like to use as embeddings.
         :param reduce_option: Given the output of the bert model, this param determines how you want to reduce results.
         :param sentence_handler: The handler to process sentences. If want to use coreference, instantiate and pass.
+        Defaults to the shared English sentence handler.
         CoreferenceHandler instance
         :param random_state: The random state to reproduce summarizations.
         :param hidden_concat: Whether or not to concat multiple hidden layers.
         :param gpu_id: GPU device index if CUDA is available.
+        :param batch_size: If set, sentences are embedded in padded mini-batches of this size.
+        :param max_tokens: If set, sentences are batched by token length under this padded token budget.
+        :param embedding_cache: Optional persistent embedding cache shared across calls.
+        :param pca_k: If set, embeddings are reduced to this many pca components before clustering. Auto picks it
+        from the number of sentences.
+        :param projection: A projection fitted on a reference corpus, reused for every document instead of pca_k.
+        :param truncate_layers: Whether to stop the forward pass at the deepest hidden layer used, skipping the pooler.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model on the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
+        :param backend: The inference backend. (eager, torchscript)
+        :param backend_path: The file the traced model is saved to, and loaded from when it exists.
+        :param registry: A model registry to share the weights with other summarizers. Call release when done.
+        :param model_classes: The model and tokenizer classes to load the model with, for models outside of the
+        BertEmbedding models. Transformers classes can be given by name.
+        :param tokenizer_name: The tokenizer name or path, if it differs from the model.
         """
-        model = BertEmbedding(model, custom_model, custom_tokenizer, gpu_id)
+        # Quantizing in the constructor keeps the weights on the cpu, instead of loading them on the gpu first.
+        model = BertEmbedding(
+            model, custom_model, custom_tokenizer, gpu_id, batch_size, max_tokens, embedding_cache, truncate_layers,
+            quantize, quantize_check, backend, backend_path, registry, model_classes, tokenizer_name,
+            quantize_spec=(hidden, reduce_option, hidden_concat)
+        )
+
+        self.embedding = model
+        self.quantization_report = model.quantization_report
         model_func = partial(model, hidden=hidden, reduce_option=reduce_option, hidden_concat=hidden_concat)
-        super().__init__(model_func, sentence_handler, random_state)
+        super().__init__(model_func, sentence_handler, random_state, pca_k, projection)
+
+    def release(self):
+        """Gives the shared model back to the registry. The summarizer can not be used afterwards."""
+        self.embedding.release()
+
+    def sessions(
+        self,
+        body: str,
+        specs: List[Tuple[Union[List[int], int], str, bool]],
+        min_length: int = 40,
+        max_length: int = 600,
+        use_spans: bool = False,
+    ) -> List[DocumentSession]:
+        """
+        Splits the body once and embeds it under several pooling configurations with a single forward pass,
+        to compare the summaries of the configurations.
+
+        :param body: The raw string body to process.
+        :param specs: The (hidden, reduce_option, hidden_concat) configurations.
+        :param min_length: Minimum length of sentence candidates to utilize for the summary.
+        :param max_length: Maximum length of sentence candidates to utilize for the summary.
+        :param use_spans: Whether to keep the sentences as character offsets into the body.
+        :return: One document session per configuration, in the order of the specs.
+        """
+        sentences = self.session(body, min_length, max_length, use_spans).sentences
+        matrices = self.embedding.create_matrices(sentences, specs)
+        return [DocumentSession(self, sentences, matrix) for matrix in matrices]
 
 
 class Summarizer(BertSummarizer):
@@ -56,14 +117,25 @@ class Summarizer(BertSummarizer):
     def __init__(
         self,
         model: str = 'bert-large-uncased',
-        custom_model: PreTrainedModel = None,
-        custom_tokenizer: PreTrainedTokenizer = None,
+        custom_model: 'PreTrainedModel' = None,
+        custom_tokenizer: 'PreTrainedTokenizer' = None,
         hidden: Union[List[int], int] = -2,
         reduce_option: str = 'mean',
-        sentence_handler: SentenceHandler = SentenceHandler(),
+        sentence_handler: SentenceHandler = None,
         random_state: int = 12345,
         hidden_concat: bool = False,
         gpu_id: int = 0,
+        batch_size: int = None,
+        max_tokens: int = None,
+        embedding_cache: EmbeddingCache = None,
+        pca_k: Union[int, str] = None,
+        projection: PCAProjection = None,
+        truncate_layers: bool = False,
+        quantize: bool = False,
+        quantize_check: List[str] = None,
+        backend: str = 'eager',
+        backend_path: str = None,
+        registry: ModelRegistry = None,
     ):
         """
         This is the main Bert Summarizer class.
@@ -76,11 +148,25 @@ class Summarizer(BertSummarizer):
         :param random_state: The random state to reproduce summarizations.
         :param hidden_concat: Whether or not to concat multiple hidden layers.
         :param gpu_id: GPU device index if CUDA is available. 
+        :param batch_size: If set, sentences are embedded in padded mini-batches of this size.
+        :param max_tokens: If set, sentences are batched by token length under this padded token budget.
+        :param embedding_cache: Optional persistent embedding cache shared across calls.
+        :param pca_k: If set, embeddings are reduced to this many pca components before clustering. Auto picks it
+        from the number of sentences.
+        :param projection: A projection fitted on a reference corpus, reused for every document instead of pca_k.
+        :param truncate_layers: Whether to stop the forward pass at the deepest hidden layer used, skipping the pooler.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model on the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
+        :param backend: The inference backend. (eager, torchscript)
+        :param backend_path: The file the traced model is saved to, and loaded from when it exists.
+        :param registry: A model registry to share the weights with other summarizers. Call release when done.
         """
 
         super(Summarizer, self).__init__(
             model, custom_model, custom_tokenizer, hidden, reduce_option, sentence_handler, random_state, hidden_concat,
-            gpu_id
+            gpu_id, batch_size, max_tokens, embedding_cache, pca_k, projection, truncate_layers, quantize,
+            quantize_check, backend, backend_path, registry
         )
 
 
@@ -89,15 +175,23 @@ class TransformerSummarizer(BertSummarizer):
     Newer style that has keywords for models and tokenizers, but allows the user to change the type.
     """
 
+    # Classes are given by name and resolved on first use, older transformers versions may lack some of them.
+    # Fast tokenizers are used where transformers has them.
     MODEL_DICT = {
-        'Bert': (BertModel, BertTokenizer),
-        'OpenAIGPT': (OpenAIGPTModel, OpenAIGPTTokenizer),
-        'GPT2': (GPT2Model, GPT2Tokenizer),
-        'CTRL': (CTRLModel, CTRLTokenizer),
-        'TransfoXL': (TransfoXLModel, TransfoXLTokenizer),
-        'XLNet': (XLNetModel, XLNetTokenizer),
-        'XLM': (XLMModel, XLMTokenizer),
-        'DistilBert': (DistilBertModel, DistilBertTokenizer),
+        'Bert': ('BertModel', 'BertTokenizerFast'),
+        'OpenAIGPT': ('OpenAIGPTModel', 'OpenAIGPTTokenizerFast'),
+        'GPT2': ('GPT2Model', 'GPT2TokenizerFast'),
+        'CTRL': ('CTRLModel', 'CTRLTokenizer'),
+        'TransfoXL': ('TransfoXLModel', 'TransfoXLTokenizer'),
+        'XLNet': ('XLNetModel', 'XLNetTokenizerFast'),
+        'XLM': ('XLMModel', 'XLMTokenizer'),
+        'DistilBert': ('DistilBertModel', 'DistilBertTokenizerFast'),
+        'Roberta': ('RobertaModel', 'RobertaTokenizerFast'),
+        'Albert': ('AlbertModel', 'AlbertTokenizerFast'),
+        'Camembert': ('CamembertModel', 'CamembertTokenizerFast'),
+        'Bart': ('BartModel', 'BartTokenizerFast'),
+        'Longformer': ('LongformerModel', 'LongformerTokenizerFast'),
+        'BigBird': ('BigBirdModel', 'BigBirdTokenizerFast'),
     }
 
     def __init__(
@@ -107,10 +201,21 @@ class TransformerSummarizer(BertSummarizer):
         transformer_tokenizer_key: str = None,
         hidden: Union[List[int], int] = -2,
         reduce_option: str = 'mean',
-        sentence_handler: SentenceHandler = SentenceHandler(),
+        sentence_handler: SentenceHandler = None,
         random_state: int = 12345,
         hidden_concat: bool = False,
         gpu_id: int = 0,
+        batch_size: int = None,
+        max_tokens: int = None,
+        embedding_cache: EmbeddingCache = None,
+        pca_k: Union[int, str] = None,
+        projection: PCAProjection = None,
+        truncate_layers: bool = False,
+        quantize: bool = False,
+        quantize_check: List[str] = None,
+        backend: str = 'eager',
+        backend_path: str = None,
+        registry: ModelRegistry = None,
     ):
         """
         :param transformer_type: The Transformer type, such as Bert, GPT2, DistilBert, etc.
@@ -118,29 +223,28 @@ class TransformerSummarizer(BertSummarizer):
         :param transformer_tokenizer_key: The transformer tokenizer key. This is the tokenizer directory.
         :param hidden: The hidden output layers to use for the summarization.
         :param reduce_option: The reduce option, such as mean, max, min, median, etc.
-        :param sentence_handler: The sentence handler class to process the raw text.
+        :param sentence_handler: The sentence handler class to process the raw text. Defaults to the shared English
+        sentence handler.
         :param random_state: The random state to use.
         :param hidden_concat: Deprecated hidden concat option.
         :param gpu_id: GPU device index if CUDA is available. 
+        :param batch_size: If set, sentences are embedded in padded mini-batches of this size.
+        :param max_tokens: If set, sentences are batched by token length under this padded token budget.
+        :param embedding_cache: Optional persistent embedding cache shared across calls.
+        :param pca_k: If set, embeddings are reduced to this many pca components before clustering. Auto picks it
+        from the number of sentences.
+        :param projection: A projection fitted on a reference corpus, reused for every document instead of pca_k.
+        :param truncate_layers: Whether to stop the forward pass at the deepest hidden layer used, skipping the pooler.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model on the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
+        :param backend: The inference backend. (eager, torchscript)
+        :param backend_path: The file the traced model is saved to, and loaded from when it exists.
+        :param registry: A model registry to share the weights with other summarizers. Call release when done.
         """
-        try:
-            self.MODEL_DICT['Roberta'] = (RobertaModel, RobertaTokenizer)
-            self.MODEL_DICT['Albert'] = (AlbertModel, AlbertTokenizer)
-            self.MODEL_DICT['Camembert'] = (CamembertModel, CamembertTokenizer)
-            self.MODEL_DICT['Bart'] = (BartModel, BartTokenizer)
-            self.MODEL_DICT['Longformer'] = (LongformerModel, LongformerTokenizer)
-            self.MODEL_DICT['BigBird'] = (BigBirdModel, BigBirdTokenizer)
-        except Exception:
-            pass  # older transformer version
-
-        model_clz, tokenizer_clz = self.MODEL_DICT[transformer_type]
-        model = model_clz.from_pretrained(
-            transformer_model_key, output_hidden_states=True)
-
-        tokenizer = tokenizer_clz.from_pretrained(
-            transformer_tokenizer_key if transformer_tokenizer_key is not None else transformer_model_key
-        )
-
         super().__init__(
-            None, model, tokenizer, hidden, reduce_option, sentence_handler, random_state, hidden_concat, gpu_id
+            transformer_model_key, None, None, hidden, reduce_option, sentence_handler, random_state, hidden_concat,
+            gpu_id, batch_size, max_tokens, embedding_cache, pca_k, projection, truncate_layers, quantize,
+            quantize_check, backend, backend_path, registry, self.MODEL_DICT[transformer_type],
+            transformer_tokenizer_key
         )
@@ -1,63 +1,247 @@
-from typing import Dict, List, Union
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple, Union
 
 import numpy as np
 from numpy import ndarray
-from sklearn.cluster import KMeans
-from sklearn.decomposition import PCA
-from sklearn.mixture import GaussianMixture
+
+from summarizer.projection import PCAProjection
+
+# sklearn, scipy and joblib are imported when a model is first fitted, to keep importing the package cheap.
+if TYPE_CHECKING:
+    from sklearn.cluster import KMeans, MiniBatchKMeans
+    from sklearn.mixture import GaussianMixture
+
+
+class CoresetKMeans:
+    """
+    K-Means fitted on a lightweight coreset: an importance weighted sample that mixes uniform sampling with
+    sampling proportional to the squared distance to the mean. Documents no larger than the coreset are fitted
+    as is.
+    """
+
+    def __init__(
+        self,
+        n_clusters: int,
+        coreset_size: int = 2048,
+        init: np.ndarray = None,
+        random_state: int = 12345,
+    ):
+        """
+        Coreset K-Means constructor.
+
+        :param n_clusters: amount of clusters.
+        :param coreset_size: The number of weighted samples to fit on.
+        :param init: Optional initial centroids.
+        :param random_state: Random state.
+        """
+        self.n_clusters = n_clusters
+        self.coreset_size = coreset_size
+        self.init = init
+        self.random_state = random_state
+
+    def fit(self, features: ndarray) -> 'CoresetKMeans':
+        """
+        Fits the centroids on a coreset of the features, then measures the inertia on all of them.
+
+        :param features: The features to cluster.
+        :return: The fitted model.
+        """
+        weights = None
+
+        if len(features) > self.coreset_size:
+            rng = np.random.RandomState(self.random_state)
+            distances = ((features - features.mean(axis=0)) ** 2).sum(axis=1)
+            probabilities = 0.5 / len(features) + 0.5 * distances / max(distances.sum(), 1e-12)
+            probabilities /= probabilities.sum()
+
+            sample = rng.choice(len(features), self.coreset_size, replace=True, p=probabilities)
+            weights = 1.0 / (self.coreset_size * probabilities[sample])
+            features_fit = features[sample]
+        else:
+            features_fit = features
+
+        from sklearn.cluster import KMeans
+
+        if self.init is not None:
+            model = KMeans(n_clusters=self.n_clusters, init=self.init, n_init=1, random_state=self.random_state)
+        else:
+            model = KMeans(n_clusters=self.n_clusters, random_state=self.random_state)
+
+        model.fit(features_fit, sample_weight=weights)
+        self.cluster_centers_ = model.cluster_centers_
+        self.labels_, self.inertia_ = self._assign(features)
+
+        return self
+
+    def _assign(self, features: ndarray) -> Tuple[ndarray, float]:
+        """
+        Assigns every feature to its closest centroid.
+
+        :param features: The features to assign.
+        :return: The labels and the inertia of the assignment.
+        """
+        squared = np.maximum(
+            (features ** 2).sum(axis=1)[:, None] - 2.0 * features @ self.cluster_centers_.T
+            + (self.cluster_centers_ ** 2).sum(axis=1),
+            0.0
+        )
+        labels = squared.argmin(axis=1)
+        return labels, float(squared[np.arange(len(features)), labels].sum())
+
+    def predict(self, features: ndarray) -> ndarray:
+        """
+        Predicts the closest centroid of every feature.
+
+        :param features: The features to assign.
+        :return: The labels.
+        """
+        return self._assign(features)[0]
 
 
 class ClusterFeatures:
     """Basic handling of clustering features."""
 
+    ALGORITHMS = ['kmeans', 'gmm', 'fast_gmm', 'minibatch', 'coreset']
+    COVARIANCE_TYPES = ['full', 'tied', 'diag', 'spherical']
+
     def __init__(
         self,
         features: ndarray,
         algorithm: str = 'kmeans',
-        pca_k: int = None,
+        pca_k: Union[int, str] = None,
         random_state: int = 12345,
+        metric: str = 'euclidean',
+        assignment: str = 'greedy',
+        covariance_type: str = None,
+        projection: PCAProjection = None,
     ):
         """
         Cluster features constructor.
 
         :param features: the embedding matrix created by bert parent.
-        :param algorithm: Which clustering algorithm to use.
-        :param pca_k: If you want the features to be ran through pca, this is the components number.
+        :param algorithm: Which clustering algorithm to use. Fast gmm is a diagonal covariance gmm on pca reduced
+        features. Minibatch and coreset are approximate k-means for very long documents.
+        (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param pca_k: If you want the features to be ran through pca, this is the components number. Auto picks it
+        from the number of sentences, and is the default for fast_gmm.
         :param random_state: Random state.
+        :param metric: Distance used to pick the sentence closest to each centroid. (euclidean, cosine)
+        :param assignment: How sentences are assigned to centroids. Greedy picks the closest unused sentence for
+        each centroid in turn, optimal minimizes the total distance of the one-to-one assignment. (greedy, optimal)
+        :param covariance_type: The covariance of the gmm algorithms. Defaults to full for gmm and diag for fast_gmm.
+        (full, tied, diag, spherical)
+        :param projection: A fitted projection, such as one fitted on a reference corpus, to apply instead of
+        fitting pca on the features.
         """
-        if pca_k:
-            self.features = PCA(n_components=pca_k).fit_transform(features)
+        assert algorithm in self.ALGORITHMS, f"algorithm must be one of {', '.join(self.ALGORITHMS)}"
+        assert metric in ['euclidean', 'cosine'], "metric must be euclidean or cosine"
+        assert assignment in ['greedy', 'optimal'], "assignment must be greedy or optimal"
+
+        if covariance_type is None:
+            covariance_type = 'diag' if algorithm == 'fast_gmm' else 'full'
+
+        assert covariance_type in self.COVARIANCE_TYPES, \
+            f"covariance_type must be one of {', '.join(self.COVARIANCE_TYPES)}"
+
+        if algorithm == 'fast_gmm' and pca_k is None and projection is None:
+            pca_k = 'auto'
+
+        if pca_k == 'auto':
+            pca_k = self.auto_pca_k(*np.shape(features))
+
+        if projection is not None:
+            self.features = projection.transform(features)
+        elif pca_k:
+            self.features = PCAProjection(pca_k, random_state=random_state).fit_transform(features)
         else:
             self.features = features
 
         self.algorithm = algorithm
         self.pca_k = pca_k
         self.random_state = random_state
+        self.metric = metric
+        self.assignment = assignment
+        self.covariance_type = covariance_type
+
+    @staticmethod
+    def auto_pca_k(n_samples: int, n_features: int) -> Optional[int]:
+        """
+        Picks the pca components from the document size. The components grow with the square root of the
+        number of sentences and stay below it, so the mixture stays well conditioned on short documents.
+
+        :param n_samples: The number of sentences.
+        :param n_features: The embedding width.
+        :return: The number of components, None if the features should be kept as is.
+        """
+        k = min(n_features, n_samples - 1, max(2, int(4 * np.sqrt(n_samples))))
+        return k if 0 < k < n_features else None
 
-    def _get_model(self, k: int) -> Union[GaussianMixture, KMeans]:
+    def _get_model(
+        self, k: int, init: np.ndarray = None
+    ) -> Union['GaussianMixture', 'KMeans', 'MiniBatchKMeans', CoresetKMeans]:
         """
         Retrieve clustering model.
 
         :param k: amount of clusters.
+        :param init: Optional initial centroids, shaped (k, features), to warm start the fit from.
         :return: Clustering model.
         """
-        if self.algorithm == 'gmm':
-            return GaussianMixture(n_components=k, random_state=self.random_state)
+        from sklearn.cluster import KMeans, MiniBatchKMeans
+        from sklearn.mixture import GaussianMixture
+
+        if self.algorithm in ['gmm', 'fast_gmm']:
+            return GaussianMixture(
+                n_components=k, covariance_type=self.covariance_type, random_state=self.random_state,
+                means_init=init
+            )
+
+        if self.algorithm == 'minibatch':
+            return MiniBatchKMeans(
+                n_clusters=k, init=init if init is not None else 'k-means++', n_init=1 if init is not None else 3,
+                random_state=self.random_state
+            )
+
+        if self.algorithm == 'coreset':
+            return CoresetKMeans(n_clusters=k, init=init, random_state=self.random_state)
+
+        if init is not None:
+            return KMeans(n_clusters=k, init=init, n_init=1, random_state=self.random_state)
 
         return KMeans(n_clusters=k, random_state=self.random_state)
 
-    def _get_centroids(self, model: Union[GaussianMixture, KMeans]) -> np.ndarray:
+    def _get_centroids(self, model: Union['GaussianMixture', 'KMeans']) -> np.ndarray:
         """
         Retrieve centroids of model.
 
         :param model: Clustering model.
         :return: Centroids.
         """
-        if self.algorithm == 'gmm':
+        if self.algorithm in ['gmm', 'fast_gmm']:
             return model.means_
 
         return model.cluster_centers_
 
+    def _distance_matrix(self, centroids: np.ndarray) -> np.ndarray:
+        """
+        Computes the distances between every centroid and every feature.
+
+        :param centroids: Centroids to measure from.
+        :return: A matrix shaped (centroids, features).
+        """
+        features = np.asarray(self.features, dtype=np.float64)
+        centroids = np.asarray(centroids, dtype=np.float64)
+
+        if self.metric == 'cosine':
+            features = features / np.maximum(np.linalg.norm(features, axis=1, keepdims=True), 1e-12)
+            centroids = centroids / np.maximum(np.linalg.norm(centroids, axis=1, keepdims=True), 1e-12)
+            return 1.0 - centroids @ features.T
+
+        squared = (
+            np.einsum('ij,ij->i', centroids, centroids)[:, None]
+            - 2.0 * centroids @ features.T
+            + np.einsum('ij,ij->i', features, features)[None, :]
+        )
+        return np.sqrt(np.maximum(squared, 0.0))
+
     def __find_closest_args(self, centroids: np.ndarray) -> Dict:
         """
         Find the closest arguments to centroid.
@@ -65,71 +249,217 @@ class ClusterFeatures:
         :param centroids: Centroids to find closest.
         :return: Closest arguments.
         """
-        centroid_min = 1e10
-        cur_arg = -1
-        args = {}
-        used_idx = []
+        distances = self._distance_matrix(centroids)
+
+        if self.assignment == 'optimal':
+            from scipy.optimize import linear_sum_assignment
 
-        for j, centroid in enumerate(centroids):
+            rows, cols = linear_sum_assignment(distances)
+            return {int(j): int(i) for j, i in zip(rows, cols)}
+
+        args = {}
+        available = np.ones(distances.shape[1], dtype=bool)
 
-            for i, feature in enumerate(self.features):
-                value = np.linalg.norm(feature - centroid)
+        for j, row in enumerate(distances):
+            row = np.where(available, row, np.inf)
+            cur_arg = int(np.argmin(row))
 
-                if value < centroid_min and i not in used_idx:
-                    cur_arg = i
-                    centroid_min = value
+            if not np.isfinite(row[cur_arg]):
+                cur_arg = -1
+            else:
+                available[cur_arg] = False
 
-            used_idx.append(cur_arg)
             args[j] = cur_arg
-            centroid_min = 1e10
-            cur_arg = -1
 
         return args
 
-    def calculate_elbow(self, k_max: int) -> List[float]:
+    def _get_inertia(self, model: Union['GaussianMixture', 'KMeans']) -> float:
         """
-        Calculates elbow up to the provided k_max.
+        Retrieve the inertia of a fitted model.
 
-        :param k_max: K_max to calculate elbow for.
-        :return: The inertias up to k_max.
+        :param model: Clustering model.
+        :return: The sum of squared distances of the features to their closest centroid.
         """
-        inertias = []
+        if hasattr(model, 'inertia_'):
+            return model.inertia_
 
-        for k in range(1, min(k_max, len(self.features))):
-            model = self._get_model(k).fit(self.features)
+        centroids = self._get_centroids(model)
+        return float(((self.features - centroids[model.predict(self.features)]) ** 2).sum())
+
+    def _seed_centroids(self, centroids: np.ndarray, k: int) -> np.ndarray:
+        """
+        Grows a smaller solution into k initial centroids by repeatedly adding the feature farthest from them.
 
-            inertias.append(model.inertia_)
+        :param centroids: The centroids of a solution with fewer clusters.
+        :param k: The amount of centroids to return.
+        :return: Initial centroids shaped (k, features).
+        """
+        centroids = np.asarray(centroids, dtype=self.features.dtype)
+        closest = np.maximum(
+            (self.features ** 2).sum(axis=1)[:, None] - 2.0 * self.features @ centroids.T
+            + (centroids ** 2).sum(axis=1),
+            0.0
+        ).min(axis=1)
+
+        while len(centroids) < k:
+            farthest = self.features[int(np.argmax(closest))]
+            centroids = np.vstack([centroids, farthest])
+            closest = np.minimum(closest, ((self.features - farthest) ** 2).sum(axis=1))
 
-        return inertias
+        return centroids
 
-    def calculate_optimal_cluster(self, k_max: int) -> int:
+    def _fit_elbow_point(self, k: int, init: np.ndarray = None) -> Tuple[float, np.ndarray]:
         """
-        Calculates the optimal cluster based on Elbow.
+        Fits a single elbow candidate.
 
-        :param k_max: The max k to search elbow for.
-        :return: The optimal cluster size.
+        :param k: amount of clusters.
+        :param init: Optional initial centroids to warm start from.
+        :return: The inertia and the centroids of the fit.
+        """
+        model = self._get_model(k, init).fit(self.features)
+        return self._get_inertia(model), self._get_centroids(model)
+
+    def search_elbow(
+        self,
+        k_max: int,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
+        coarse_step: int = 8,
+    ) -> Dict[int, float]:
+        """
+        Fits the elbow candidates and returns their inertias. The candidates are fitted in waves of n_jobs
+        parallel fits.
+
+        :param k_max: K_max to calculate elbow for. Candidates range from 1 to k_max - 1.
+        :param n_jobs: Number of fits to run in parallel. -1 uses all cores.
+        :param search: Full fits every k, coarse fits a grid of coarse_step, then repeatedly halves the step
+        around the strongest drop in inertia. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: If set with a full search, stops once this many k past the strongest elbow have
+        failed to beat it.
+        :param coarse_step: The initial step of the coarse grid.
+        :return: The inertias by k, in ascending k order.
+        """
+        assert search in ['full', 'coarse'], "search must be full or coarse"
+
+        from joblib import Parallel, delayed, effective_n_jobs
+
+        k_top = min(k_max, len(self.features)) - 1
+        wave = effective_n_jobs(n_jobs) if n_jobs else 1
+        inertias = {}
+        solutions = {}
+
+        def fit_wave(ks: List[int]):
+            ks = [k for k in ks if k not in inertias]
+            inits = []
+
+            for k in ks:
+                smaller = [j for j in solutions if j < k]
+                inits.append(
+                    self._seed_centroids(solutions[max(smaller)], k) if warm_start and smaller else None
+                )
+
+            results = Parallel(n_jobs=min(wave, len(ks)), prefer='threads')(
+                delayed(self._fit_elbow_point)(k, init) for k, init in zip(ks, inits)
+            ) if len(ks) > 1 else [self._fit_elbow_point(k, init) for k, init in zip(ks, inits)]
+
+            for k, (inertia, centroids) in zip(ks, results):
+                inertias[k] = inertia
+                solutions[k] = centroids
+
+        if search == 'full':
+            for start in range(1, k_top + 1, wave):
+                fit_wave(list(range(start, min(start + wave, k_top + 1))))
+                best_k = self._strongest_elbow(inertias, k_top)
+
+                if patience is not None and best_k > 1 and max(inertias) - best_k >= patience:
+                    break
+        else:
+            low, high, step = 1, k_top, max(coarse_step, 1)
+
+            while True:
+                grid = sorted(set(range(low, high + 1, step)) | {high})
+                for start in range(0, len(grid), wave):
+                    fit_wave(grid[start:start + wave])
+
+                if step == 1:
+                    break
+
+                # the interval with the largest average drop holds the strongest single step drop.
+                pairs = list(zip(grid, grid[1:]))
+                a, b = max(pairs, key=lambda p: (inertias[p[0]] - inertias[p[1]]) / (p[1] - p[0]))
+                low, high, step = max(a - step, 1), min(b + step, k_top), step // 2
+
+        return dict(sorted(inertias.items()))
+
+    def calculate_elbow(
+        self,
+        k_max: int,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
+    ) -> List[float]:
+        """
+        Calculates elbow up to the provided k_max.
+
+        :param k_max: K_max to calculate elbow for.
+        :param n_jobs: Number of fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
+        :return: The inertias up to k_max, for the searched k values.
+        """
+        return list(self.search_elbow(k_max, n_jobs, search, warm_start, patience).values())
+
+    @staticmethod
+    def _strongest_elbow(inertias: Dict[int, float], k_top: int) -> int:
         """
-        delta_1 = []
-        delta_2 = []
+        Finds the elbow of the inertias. The original second difference strength, delta_2[j + 1] - delta_1[j + 1]
+        for k = j + 1, reduces to the drop in inertia from k - 1 to k clusters, for k between 3 and k_top - 1.
 
+        :param inertias: The inertias by k.
+        :param k_top: The largest k of the search.
+        :return: The k with the strongest elbow, 1 if there is none.
+        """
         max_strength = 0
         k = 1
 
-        inertias = self.calculate_elbow(k_max)
+        for j in sorted(inertias):
+            if not 3 <= j <= k_top - 1 or j - 1 not in inertias:
+                continue
 
-        for i in range(len(inertias)):
-            delta_1.append(inertias[i] - inertias[i - 1] if i > 0 else 0.0)
-            delta_2.append(delta_1[i] - delta_1[i - 1] if i > 1 else 0.0)
-
-        for j in range(len(inertias)):
-            strength = 0 if j <= 1 or j == len(inertias) - 1 else delta_2[j + 1] - delta_1[j + 1]
+            strength = inertias[j - 1] - inertias[j]
 
             if strength > max_strength:
                 max_strength = strength
-                k = j + 1
+                k = j
 
         return k
 
+    def calculate_optimal_cluster(
+        self,
+        k_max: int,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
+    ) -> int:
+        """
+        Calculates the optimal cluster based on Elbow.
+
+        :param k_max: The max k to search elbow for.
+        :param n_jobs: Number of fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
+        :return: The optimal cluster size.
+        """
+        inertias = self.search_elbow(k_max, n_jobs, search, warm_start, patience)
+        return self._strongest_elbow(inertias, min(k_max, len(self.features)) - 1)
+
     def cluster(self, ratio: float = 0.1, num_sentences: int = None) -> List[int]:
         """
         Clusters sentences based on the ratio.
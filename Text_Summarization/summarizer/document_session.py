@@ -0,0 +1,177 @@
+from typing import List, Optional, Union
+
+import numpy as np
+
+from summarizer.text_processors.sentence_spans import SentenceSpans
+from summarizer.util import AGGREGATE_MAP
+
+
+class DocumentSession:
+    """
+    Analysis session over a single document.
+
+    The body is split into sentences once and embedded at most once, so elbow searches and any number of
+    summaries with different ratios or sentence counts reuse the same sentences and embeddings.
+    """
+
+    def __init__(
+        self,
+        processor,
+        sentences: List[str],
+        embeddings: np.ndarray = None,
+    ):
+        """
+        Document Session Constructor. Use SummaryProcessor.session to open one from a raw body.
+
+        :param processor: The SummaryProcessor providing the model and clustering stage.
+        :param sentences: The sentences of the document.
+        :param embeddings: Precomputed embeddings of the sentences. Computed on first use if not given.
+        """
+        self.processor = processor
+        self.sentences = sentences
+        self._embeddings = embeddings
+
+    @property
+    def embeddings(self) -> np.ndarray:
+        """The embedding matrix of the sentences, computed on first access."""
+        if self._embeddings is None:
+            self._embeddings = self.processor.model(self.sentences)
+
+        return self._embeddings
+
+    def calculate_elbow(
+        self,
+        algorithm: str = 'kmeans',
+        k_max: int = None,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
+    ) -> List[float]:
+        """
+        Calculates elbow across the clusters.
+
+        :param algorithm: The algorithm to use for clustering.
+        :param k_max: The maximum number of clusters to search.
+        :param n_jobs: Number of elbow fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
+        :return: List of elbow inertia values.
+        """
+        if k_max is None:
+            k_max = len(self.sentences) - 1
+
+        return self.processor.cluster_features(self.embeddings, algorithm).calculate_elbow(
+            k_max, n_jobs, search, warm_start, patience)
+
+    def calculate_optimal_k(
+        self,
+        algorithm: str = 'kmeans',
+        k_max: int = None,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
+    ) -> int:
+        """
+        Calculates the optimal Elbow K.
+
+        :param algorithm: The algorithm to use for clustering.
+        :param k_max: The maximum number of clusters to search.
+        :param n_jobs: Number of elbow fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
+        :return: The optimal k value as an int.
+        """
+        if k_max is None:
+            k_max = len(self.sentences) - 1
+
+        return self.processor.cluster_features(self.embeddings, algorithm).calculate_optimal_cluster(
+            k_max, n_jobs, search, warm_start, patience)
+
+    def run_embeddings(
+        self,
+        ratio: float = 0.2,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+        aggregate: str = None,
+    ) -> Optional[np.ndarray]:
+        """
+        Runs the clusters to find the centroids, then combines the embeddings.
+
+        :param ratio: Ratio of sentences to use
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use. Overrides ratio.
+        :param aggregate: One of mean, median, max, min. Applied on zero axis
+        :return: A summary embedding
+        """
+        if not self.sentences:
+            return None
+
+        _, embeddings = self.processor.cluster_runner(
+            self.sentences, ratio, algorithm, use_first, num_sentences, hidden=self.embeddings)
+
+        if aggregate is not None:
+            assert aggregate in [
+                'mean', 'median', 'max', 'min'], "aggregate must be mean, min, max, or median"
+            embeddings = AGGREGATE_MAP[aggregate](embeddings, axis=0)
+
+        return embeddings
+
+    def run_spans(
+        self,
+        ratio: float = 0.2,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+    ) -> np.ndarray:
+        """
+        Runs the clusters to find the centroids, then returns the character offsets of the summary sentences.
+        The session must have been opened with use_spans.
+
+        :param ratio: Ratio of sentences to use
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use (overrides ratio).
+        :return: The (start, end) character offsets of the summary sentences, shaped (sentences, 2).
+        """
+        assert isinstance(self.sentences, SentenceSpans), "run_spans requires a session opened with use_spans"
+
+        if not self.sentences:
+            return self.sentences.spans
+
+        indices = self.processor.cluster_indices(self.embeddings, ratio, algorithm, use_first, num_sentences)
+        return self.sentences.spans[indices]
+
+    def run(
+        self,
+        ratio: float = 0.2,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+        return_as_list: bool = False,
+    ) -> Union[List, str]:
+        """
+        Runs the clusters to find the centroids, then combines the sentences.
+
+        :param ratio: Ratio of sentences to use
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use (overrides ratio).
+        :param return_as_list: Whether or not to return sentences as list.
+        :return: A summary sentence
+        """
+        sentences = self.sentences
+
+        if sentences:
+            sentences, _ = self.processor.cluster_runner(
+                sentences, ratio, algorithm, use_first, num_sentences, hidden=self.embeddings)
+
+        if return_as_list:
+            return list(sentences)
+        else:
+            return ' '.join(sentences)
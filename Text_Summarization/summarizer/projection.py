@@ -0,0 +1,150 @@
+from typing import Iterable
+
+import numpy as np
+from numpy import ndarray
+
+
+class PCAProjection:
+    """
+    Float32 PCA projection for the clustering stage.
+
+    It can be fitted per document, or once on a reference corpus and reused across documents, in which case
+    projecting a document costs a single matmul.
+    """
+
+    METHODS = ['randomized', 'incremental']
+
+    def __init__(
+        self,
+        n_components: int,
+        method: str = 'randomized',
+        batch_size: int = None,
+        random_state: int = 12345,
+    ):
+        """
+        PCA Projection constructor.
+
+        :param n_components: The number of components to keep. Clipped to what the fitted data allows.
+        :param method: Randomized svd, or incremental pca for corpora fitted batch by batch. (randomized, incremental)
+        :param batch_size: The batch size of incremental pca.
+        :param random_state: Random state.
+        """
+        assert method in self.METHODS, "method must be randomized or incremental"
+
+        self.n_components = n_components
+        self.method = method
+        self.batch_size = batch_size
+        self.random_state = random_state
+        self.mean_ = None
+        self.components_ = None
+        self._incremental = None
+
+    @property
+    def fitted(self) -> bool:
+        """Whether the projection has been fitted."""
+        return self.components_ is not None
+
+    def fit(self, features: ndarray) -> 'PCAProjection':
+        """
+        Fits the projection on the features.
+
+        :param features: The embedding matrix to fit on.
+        :return: The fitted projection.
+        """
+        features = np.asarray(features, dtype=np.float32)
+        n_components = min(self.n_components, *features.shape)
+
+        from sklearn.decomposition import PCA, IncrementalPCA
+
+        if self.method == 'incremental':
+            model = IncrementalPCA(n_components=n_components, batch_size=self.batch_size).fit(features)
+        else:
+            model = PCA(n_components=n_components, svd_solver='randomized', random_state=self.random_state)
+            model.fit(features)
+
+        self._set(model)
+        return self
+
+    def partial_fit(self, features: ndarray) -> 'PCAProjection':
+        """
+        Updates an incremental projection with a batch of a reference corpus.
+
+        :param features: The embedding matrix of the batch.
+        :return: The updated projection.
+        """
+        assert self.method == 'incremental', "partial_fit requires the incremental method"
+
+        if self._incremental is None:
+            from sklearn.decomposition import IncrementalPCA
+
+            self._incremental = IncrementalPCA(n_components=self.n_components, batch_size=self.batch_size)
+
+        self._set(self._incremental.partial_fit(np.asarray(features, dtype=np.float32)))
+        return self
+
+    def fit_corpus(self, batches: Iterable[ndarray]) -> 'PCAProjection':
+        """
+        Fits the projection on a reference corpus given as embedding batches.
+
+        :param batches: The embedding matrices of the corpus.
+        :return: The fitted projection.
+        """
+        if self.method == 'incremental':
+            for batch in batches:
+                self.partial_fit(batch)
+
+            return self
+
+        return self.fit(np.vstack(list(batches)))
+
+    def _set(self, model):
+        """
+        Keeps the float32 mean and components of a fitted sklearn model.
+
+        :param model: The fitted model.
+        """
+        self.mean_ = model.mean_.astype(np.float32)
+        self.components_ = model.components_.astype(np.float32)
+
+    def transform(self, features: ndarray) -> ndarray:
+        """
+        Projects the features.
+
+        :param features: The embedding matrix to project.
+        :return: The projected float32 matrix.
+        """
+        assert self.fitted, "The projection must be fitted before it is used"
+        return (np.asarray(features, dtype=np.float32) - self.mean_) @ self.components_.T
+
+    def fit_transform(self, features: ndarray) -> ndarray:
+        """
+        Fits the projection on the features and projects them.
+
+        :param features: The embedding matrix.
+        :return: The projected float32 matrix.
+        """
+        return self.fit(features).transform(features)
+
+    def save(self, path: str):
+        """
+        Saves the fitted projection.
+
+        :param path: The npz file to write.
+        """
+        assert self.fitted, "The projection must be fitted before it is saved"
+        np.savez(path, mean=self.mean_, components=self.components_)
+
+    @classmethod
+    def load(cls, path: str) -> 'PCAProjection':
+        """
+        Loads a saved projection.
+
+        :param path: The npz file to read.
+        :return: The fitted projection.
+        """
+        with np.load(path) as data:
+            projection = cls(n_components=data['components'].shape[0])
+            projection.mean_ = data['mean']
+            projection.components_ = data['components']
+
+        return projection
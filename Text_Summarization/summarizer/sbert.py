@@ -1,5 +1,9 @@
+from typing import List, Union
+
+from summarizer.projection import PCAProjection
 from summarizer.summary_processor import SummaryProcessor
 from summarizer.text_processors.sentence_handler import SentenceHandler
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
 from summarizer.transformer_embeddings.sbert_embedding import SBertEmbedding
 
 
@@ -13,17 +17,32 @@ class SBertSummarizer(SummaryProcessor):
     def __init__(
         self,
         model: str = 'all-mpnet-base-v2',
-        sentence_handler: SentenceHandler = SentenceHandler(),
-        random_state: int = 12345
+        sentence_handler: SentenceHandler = None,
+        random_state: int = 12345,
+        embedding_cache: EmbeddingCache = None,
+        pca_k: Union[int, str] = None,
+        projection: PCAProjection = None,
+        quantize: bool = False,
+        quantize_check: List[str] = None,
     ):
         """
         SBert Summarizer.
 
         :param model: The model for the sentence transformer.
         :sentence_handler: The handler to process sentences. If want to use coreference, instantiate and pass.
+        Defaults to the shared English sentence handler.
         :param random_state: The random state to reproduce summarizations.
+        :param embedding_cache: Optional persistent embedding cache shared across calls.
+        :param pca_k: If set, embeddings are reduced to this many pca components before clustering. Auto picks it
+        from the number of sentences.
+        :param projection: A projection fitted on a reference corpus, reused for every document instead of pca_k.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model on the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
         """
-        model_func = SBertEmbedding(model)
+        model_func = SBertEmbedding(model, embedding_cache, quantize, quantize_check)
+        self.quantization_report = model_func.quantization_report
         super().__init__(
-            model=model_func, sentence_handler=sentence_handler, random_state=random_state
+            model=model_func, sentence_handler=sentence_handler, random_state=random_state, pca_k=pca_k,
+            projection=projection
         )
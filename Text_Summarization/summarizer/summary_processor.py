@@ -1,10 +1,13 @@
-from typing import Callable, List, Optional, Tuple, Union
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple, Union
 
 import numpy as np
 
 from summarizer.cluster_features import ClusterFeatures
+from summarizer.document_session import DocumentSession
+from summarizer.projection import PCAProjection
 from summarizer.text_processors.sentence_handler import SentenceHandler
-from summarizer.util import AGGREGATE_MAP
 
 
 class SummaryProcessor:
@@ -13,20 +16,62 @@ class SummaryProcessor:
     def __init__(
         self,
         model: Callable,
-        sentence_handler: SentenceHandler,
-        random_state: int = 12345
+        sentence_handler: SentenceHandler = None,
+        random_state: int = 12345,
+        pca_k: Union[int, str] = None,
+        projection: PCAProjection = None,
     ):
         """
         Summarizer Processor.
 
         :param model: The callable model for creating embeddings from sentences.
         :sentence_handler: The handler to process sentences. If want to use coreference, instantiate and pass.
+        Defaults to the shared English sentence handler.
         :param random_state: The random state to reproduce summarizations.
+        :param pca_k: If set, embeddings are reduced to this many pca components before clustering. Auto picks it
+        from the number of sentences.
+        :param projection: A projection fitted on a reference corpus, reused for every document instead of pca_k.
         """
         np.random.seed(random_state)
         self.model = model
-        self.sentence_handler = sentence_handler
+        self.sentence_handler = sentence_handler if sentence_handler is not None else SentenceHandler.default()
         self.random_state = random_state
+        self.pca_k = pca_k
+        self.projection = projection
+
+    def cluster_features(self, hidden: np.ndarray, algorithm: str = 'kmeans') -> ClusterFeatures:
+        """
+        Builds the clustering stage for the given embeddings, including the configured pca projection.
+
+        :param hidden: The embeddings of the sentences.
+        :param algorithm: Which clustering algorithm to use.
+        :return: The cluster features.
+        """
+        return ClusterFeatures(
+            hidden, algorithm, pca_k=self.pca_k, random_state=self.random_state, projection=self.projection)
+
+    def session(
+        self,
+        body: str,
+        min_length: int = 40,
+        max_length: int = 600,
+        use_spans: bool = False,
+    ) -> DocumentSession:
+        """
+        Splits the body once and returns a session that embeds it at most once, no matter how many elbow
+        searches or summaries are run on it.
+
+        :param body: The raw string body to process.
+        :param min_length: Minimum length of sentence candidates to utilize for the summary.
+        :param max_length: Maximum length of sentence candidates to utilize for the summary.
+        :param use_spans: Whether to keep the sentences as character offsets into the body, materializing only
+        the text that is used.
+        :return: A document session.
+        """
+        if use_spans:
+            return DocumentSession(self, self.sentence_handler.spans(body, min_length, max_length))
+
+        return DocumentSession(self, self.sentence_handler(body, min_length, max_length))
 
     def calculate_elbow(
         self,
@@ -35,6 +80,10 @@ class SummaryProcessor:
         min_length: int = 40,
         max_length: int = 600,
         k_max: int = None,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
     ) -> List[float]:
         """
         Calculates elbow across the clusters.
@@ -44,18 +93,14 @@ class SummaryProcessor:
         :param min_length: The min length to use.
         :param max_length: The max length to use.
         :param k_max: The maximum number of clusters to search.
+        :param n_jobs: Number of elbow fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
         :return: List of elbow inertia values.
         """
-        sentences = self.sentence_handler(body, min_length, max_length)
-
-        if k_max is None:
-            k_max = len(sentences) - 1
-
-        hidden = self.model(sentences)
-        elbow = ClusterFeatures(
-            hidden, algorithm, random_state=self.random_state).calculate_elbow(k_max)
-
-        return elbow
+        return self.session(body, min_length, max_length).calculate_elbow(
+            algorithm, k_max, n_jobs, search, warm_start, patience)
 
     def calculate_optimal_k(
         self,
@@ -64,6 +109,10 @@ class SummaryProcessor:
         min_length: int = 40,
         max_length: int = 600,
         k_max: int = None,
+        n_jobs: int = None,
+        search: str = 'full',
+        warm_start: bool = False,
+        patience: int = None,
     ) -> int:
         """
         Calculates the optimal Elbow K.
@@ -73,18 +122,14 @@ class SummaryProcessor:
         :param min_length: The min length to use.
         :param max_length: The max length to use.
         :param k_max: The maximum number of clusters to search.
+        :param n_jobs: Number of elbow fits to run in parallel. -1 uses all cores.
+        :param search: Which k grid to search. (full, coarse)
+        :param warm_start: Whether to seed every fit from the closest smaller solution already fitted.
+        :param patience: Stops a full search once this many k past the strongest elbow have failed to beat it.
         :return: The optimal k value as an int.
         """
-        sentences = self.sentence_handler(body, min_length, max_length)
-
-        if k_max is None:
-            k_max = len(sentences) - 1
-
-        hidden = self.model(sentences)
-        optimal_k = ClusterFeatures(
-            hidden, algorithm, random_state=self.random_state).calculate_optimal_cluster(k_max)
-
-        return optimal_k
+        return self.session(body, min_length, max_length).calculate_optimal_k(
+            algorithm, k_max, n_jobs, search, warm_start, patience)
 
     def cluster_runner(
         self,
@@ -93,6 +138,7 @@ class SummaryProcessor:
         algorithm: str = 'kmeans',
         use_first: bool = True,
         num_sentences: int = 3,
+        hidden: np.ndarray = None,
     ) -> Tuple[List[str], np.ndarray]:
         """
         Runs the cluster algorithm based on the hidden state. Returns both the embeddings and sentences.
@@ -102,22 +148,49 @@ class SummaryProcessor:
         :param algorithm: Type of algorithm to use for clustering.
         :param use_first: Return the first sentence in the output (helpful for news stories, etc).
         :param num_sentences: Number of sentences to use for summarization.
+        :param hidden: Precomputed embeddings of the sentences. Computed from the model if not given.
         :return: A tuple of summarized sentences and embeddings
         """
-        first_embedding = None
-        hidden = self.model(sentences)
+        if hidden is None:
+            hidden = self.model(sentences)
+
+        if use_first and len(sentences) <= 1:
+            return list(sentences), hidden
 
+        summary_sentence_indices = self.cluster_indices(hidden, ratio, algorithm, use_first, num_sentences)
+
+        sentences = [sentences[j] for j in summary_sentence_indices]
+        embeddings = np.asarray([hidden[j] for j in summary_sentence_indices])
+
+        return sentences, embeddings
+
+    def cluster_indices(
+        self,
+        hidden: np.ndarray,
+        ratio: float = 0.2,
+        algorithm: str = 'kmeans',
+        use_first: bool = True,
+        num_sentences: int = 3,
+    ) -> List[int]:
+        """
+        Runs the cluster algorithm based on the hidden state. Returns the sorted indices of the summary sentences.
+
+        :param hidden: The embeddings of the sentences.
+        :param ratio: The ratio to use for clustering.
+        :param algorithm: Type of algorithm to use for clustering.
+        :param use_first: Return the first sentence in the output (helpful for news stories, etc).
+        :param num_sentences: Number of sentences to use for summarization.
+        :return: The indices of the summary sentences.
+        """
         if use_first:
             num_sentences = num_sentences - 1 if num_sentences else num_sentences
 
-            if len(sentences) <= 1:
-                return sentences, hidden
+            if len(hidden) <= 1:
+                return list(range(len(hidden)))
 
-            first_embedding = hidden[0, :]
             hidden = hidden[1:, :]
 
-        summary_sentence_indices = ClusterFeatures(
-            hidden, algorithm, random_state=self.random_state).cluster(ratio, num_sentences)
+        summary_sentence_indices = self.cluster_features(hidden, algorithm).cluster(ratio, num_sentences)
 
         if use_first:
             if summary_sentence_indices:
@@ -127,12 +200,7 @@ class SummaryProcessor:
             else:
                 summary_sentence_indices.append(0)
 
-            hidden = np.vstack([first_embedding, hidden])
-
-        sentences = [sentences[j] for j in summary_sentence_indices]
-        embeddings = np.asarray([hidden[j] for j in summary_sentence_indices])
-
-        return sentences, embeddings
+        return summary_sentence_indices
 
     def run_embeddings(
         self,
@@ -153,24 +221,39 @@ class SummaryProcessor:
         :param min_length: Minimum length of sentence candidates to utilize for the summary.
         :param max_length: Maximum length of sentence candidates to utilize for the summary
         :param use_first: Whether or not to use the first sentence
-        :param algorithm: Which clustering algorithm to use. (kmeans, gmm)
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
         :param num_sentences: Number of sentences to use. Overrides ratio.
         :param aggregate: One of mean, median, max, min. Applied on zero axis
         :return: A summary embedding
         """
-        sentences = self.sentence_handler(body, min_length, max_length)
+        return self.session(body, min_length, max_length).run_embeddings(
+            ratio, use_first, algorithm, num_sentences, aggregate)
 
-        if sentences:
-            _, embeddings = self.cluster_runner(sentences, ratio, algorithm, use_first, num_sentences)
-
-            if aggregate is not None:
-                assert aggregate in [
-                    'mean', 'median', 'max', 'min'], "aggregate must be mean, min, max, or median"
-                embeddings = AGGREGATE_MAP[aggregate](embeddings, axis=0)
-
-            return embeddings
+    def run_spans(
+        self,
+        body: str,
+        ratio: float = 0.2,
+        min_length: int = 40,
+        max_length: int = 600,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+    ) -> np.ndarray:
+        """
+        Preprocesses the sentences as character offsets, runs the clusters to find the centroids, then returns the
+        offsets of the summary sentences, so they can be highlighted in place.
 
-        return None
+        :param body: The raw string body to process
+        :param ratio: Ratio of sentences to use
+        :param min_length: Minimum length of sentence candidates to utilize for the summary.
+        :param max_length: Maximum length of sentence candidates to utilize for the summary
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use (overrides ratio).
+        :return: The (start, end) character offsets of the summary sentences, shaped (sentences, 2).
+        """
+        return self.session(body, min_length, max_length, use_spans=True).run_spans(
+            ratio, use_first, algorithm, num_sentences)
 
     def run(
         self,
@@ -191,20 +274,118 @@ class SummaryProcessor:
         :param min_length: Minimum length of sentence candidates to utilize for the summary.
         :param max_length: Maximum length of sentence candidates to utilize for the summary
         :param use_first: Whether or not to use the first sentence
-        :param algorithm: Which clustering algorithm to use. (kmeans, gmm)
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
         :param num_sentences: Number of sentences to use (overrides ratio).
         :param return_as_list: Whether or not to return sentences as list.
         :return: A summary sentence
         """
-        sentences = self.sentence_handler(body, min_length, max_length)
+        return self.session(body, min_length, max_length).run(
+            ratio, use_first, algorithm, num_sentences, return_as_list)
+
+    def summarize_many(
+        self,
+        bodies: Iterable[str],
+        ratio: float = 0.2,
+        min_length: int = 40,
+        max_length: int = 600,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+        return_as_list: bool = False,
+        n_workers: int = None,
+        chunk_size: int = 64,
+        n_process: int = 1,
+    ) -> Iterator[Union[List, str]]:
+        """
+        Summarizes many documents, streaming the summaries back in input order. The documents are split lazily in
+        a pipelined pass, the union of the sentences of every chunk is embedded in one shared call, and the
+        documents are clustered concurrently.
+
+        :param bodies: The raw string bodies to process.
+        :param ratio: Ratio of sentences to use
+        :param min_length: Minimum length of sentence candidates to utilize for the summary.
+        :param max_length: Maximum length of sentence candidates to utilize for the summary
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use (overrides ratio).
+        :param return_as_list: Whether or not to return sentences as list.
+        :param n_workers: Number of threads clustering documents concurrently.
+        :param chunk_size: Number of documents split and embedded together.
+        :param n_process: Number of processes splitting sentences ahead of the embedding.
+        :return: An iterator over the summaries.
+        """
+        documents = self.sentence_handler.stream(bodies, min_length, max_length, chunk_size, n_process)
+
+        with ThreadPoolExecutor(max_workers=n_workers) as pool:
+            while True:
+                chunk = list(islice(documents, chunk_size))
 
-        if sentences:
-            sentences, _ = self.cluster_runner(sentences, ratio, algorithm, use_first, num_sentences)
+                if not chunk:
+                    return
 
-        if return_as_list:
-            return sentences
-        else:
-            return ' '.join(sentences)
+                sessions = self._sessions(chunk)
+
+                yield from pool.map(
+                    lambda session: session.run(ratio, use_first, algorithm, num_sentences, return_as_list),
+                    sessions
+                )
+
+    def _sessions(self, documents: List[List[str]]) -> List[DocumentSession]:
+        """
+        Embeds the union of the sentences of the documents in one call, then opens a session per document.
+
+        :param documents: The sentences of every document.
+        :return: A session per document, with its embeddings precomputed.
+        """
+        rows = {}
+
+        for sentences in documents:
+            for sentence in sentences:
+                rows.setdefault(sentence, len(rows))
+
+        if not rows:
+            return [DocumentSession(self, sentences) for sentences in documents]
+
+        hidden = self.model(list(rows))
+
+        return [
+            DocumentSession(self, sentences, hidden[[rows[s] for s in sentences]]) for sentences in documents
+        ]
+
+    def run_batch(
+        self,
+        bodies: Iterable[str],
+        ratio: float = 0.2,
+        min_length: int = 40,
+        max_length: int = 600,
+        use_first: bool = True,
+        algorithm: str = 'kmeans',
+        num_sentences: int = None,
+        return_as_list: bool = False,
+        n_workers: int = None,
+        chunk_size: int = 64,
+        n_process: int = 1,
+    ) -> List[Union[List, str]]:
+        """
+        Summarizes many documents with a shared embedding pass. See summarize_many.
+
+        :param bodies: The raw string bodies to process.
+        :param ratio: Ratio of sentences to use
+        :param min_length: Minimum length of sentence candidates to utilize for the summary.
+        :param max_length: Maximum length of sentence candidates to utilize for the summary
+        :param use_first: Whether or not to use the first sentence
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
+        :param num_sentences: Number of sentences to use (overrides ratio).
+        :param return_as_list: Whether or not to return sentences as list.
+        :param n_workers: Number of threads clustering documents concurrently.
+        :param chunk_size: Number of documents split and embedded together.
+        :param n_process: Number of processes splitting sentences ahead of the embedding.
+        :return: The summaries, in input order.
+        """
+        return list(self.summarize_many(
+            bodies, ratio, min_length, max_length, use_first, algorithm, num_sentences, return_as_list, n_workers,
+            chunk_size, n_process
+        ))
 
     def __call__(
         self,
@@ -226,7 +407,7 @@ class SummaryProcessor:
         :param min_length: Minimum length of sentence candidates to utilize for the summary.
         :param max_length: Maximum length of sentence candidates to utilize for the summary.
         :param use_first: Whether or not to use the first sentence.
-        :param algorithm: Which clustering algorithm to use. (kmeans, gmm)
+        :param algorithm: Which clustering algorithm to use. (kmeans, gmm, fast_gmm, minibatch, coreset)
         :param num_sentences: Number of sentences to use (overrides ratio).
         :param return_as_list: Whether or not to return sentences as list.
         :return: A summary sentence.
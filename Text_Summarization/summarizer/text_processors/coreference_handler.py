@@ -1,30 +1,219 @@
 # removed previous import and related functionality since it's just a blank language model,
 #  while neuralcoref requires passing pretrained language model via spacy.load()
 
-from typing import List
+from array import array
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Tuple
 
 import neuralcoref
 import spacy
 
+from summarizer.text_processors.regex_sentence_handler import RegexSentenceHandler
 from summarizer.text_processors.sentence_abc import SentenceABC
+from summarizer.text_processors.sentence_spans import SentenceSpans
+
+_WORKER_NLP = None
+
+
+def _load_pipeline(spacy_model: str, greedyness: float):
+    """
+    Loads a spacy pipeline with neuralcoref added to it.
+
+    :param spacy_model: The spacy model to load.
+    :param greedyness: The greedyness factor.
+    :return: The pipeline.
+    """
+    nlp = spacy.load(spacy_model)
+    neuralcoref.add_to_pipe(nlp, greedyness=greedyness)
+    return nlp
+
+
+def _init_worker(spacy_model: str, greedyness: float):
+    """
+    Loads the pipeline once per pool process.
+
+    :param spacy_model: The spacy model to load.
+    :param greedyness: The greedyness factor.
+    """
+    global _WORKER_NLP
+    _WORKER_NLP = _load_pipeline(spacy_model, greedyness)
+
+
+def _resolve_window(nlp, text: str, core_start: int) -> List[str]:
+    """
+    Parses a window once and resolves its sentences from the coreference clusters of that parse.
+
+    :param nlp: The pipeline with neuralcoref.
+    :param text: The window text, made of its context followed by its core.
+    :param core_start: The character offset where the core starts within the window.
+    :return: The resolved sentences of the core, with their whitespace, so that they join back into the resolved
+    core text. A sentence that spacy merged across the start of the core only keeps its part in the core, the rest
+    belongs to the previous window.
+    """
+    doc = nlp(text)
+    resolved = [token.text_with_ws for token in doc]
+
+    # Same replacement as neuralcoref's coref_resolved, without reparsing the resolved text.
+    for cluster in doc._.coref_clusters:
+        for mention in cluster.mentions:
+            if mention == cluster.main:
+                continue
+
+            resolved[mention.start] = cluster.main.text + doc[mention.end - 1].whitespace_
+
+            for i in range(mention.start + 1, mention.end):
+                resolved[i] = ''
+
+    # The core starts on a sentence boundary of the regex splitter, so no token straddles it.
+    first = next((token.i for token in doc if token.idx >= core_start), len(doc))
+    sentences = []
+
+    for sent in doc.sents:
+        start = max(sent.start, first)
+
+        if start < sent.end:
+            sentences.append(''.join(resolved[start:sent.end]))
+
+    return sentences
+
+
+def _resolve_worker(window: Tuple[str, int]) -> List[str]:
+    """
+    Resolves a window with the pipeline of the pool process.
+
+    :param window: The window text and its core offset.
+    :return: The resolved core sentences.
+    """
+    return _resolve_window(_WORKER_NLP, *window)
 
 
 class CoreferenceHandler(SentenceABC):
     """HuggingFace Coreference Handler."""
 
     def __init__(
-        self, spacy_model: str = 'en_core_web_sm', greedyness: float = 0.45
+        self,
+        spacy_model: str = 'en_core_web_sm',
+        greedyness: float = 0.45,
+        window_size: int = None,
+        overlap: int = 1000,
+        n_process: int = 1,
     ):
         """
         Corefence handler. Only works with spacy < 3.0.
 
         :param spacy_model: The spacy model to use as default.
         :param greedyness: The greedyness factor.
+        :param window_size: Resolves long bodies in windows of about this many characters, cut on sentence
+        boundaries, to bound memory. None resolves the whole body at once.
+        :param overlap: The characters of preceding sentences each window is given as context, so that mentions
+        can still be resolved to antecedents in the previous window.
+        :param n_process: Number of processes resolving the windows. Every process loads its own pipeline, once, and
+        the pool is reused across calls until close.
         """
-        nlp = spacy.load(spacy_model)
-        neuralcoref.add_to_pipe(nlp, greedyness=greedyness)
+        nlp = _load_pipeline(spacy_model, greedyness)
         super().__init__(nlp, is_spacy_3=False)
 
+        self.spacy_model = spacy_model
+        self.greedyness = greedyness
+        self.window_size = window_size
+        self.overlap = overlap
+        self.n_process = n_process
+        self.splitter = RegexSentenceHandler()
+        self._executor = None
+
+    def _pool(self) -> ProcessPoolExecutor:
+        """
+        Retrieves the process pool, starting it on first use.
+
+        :return: The pool.
+        """
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                self.n_process, initializer=_init_worker, initargs=(self.spacy_model, self.greedyness)
+            )
+
+        return self._executor
+
+    def close(self):
+        """Shuts the process pool down. It is started again if the handler is used afterwards."""
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    def __enter__(self) -> 'CoreferenceHandler':
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def windows(self, body: str) -> List[Tuple[str, int]]:
+        """
+        Cuts the body into overlapping windows on sentence boundaries.
+
+        :param body: The raw string body.
+        :return: The window texts, and the offsets where their cores start within them.
+        """
+        if self.window_size is None or len(body) <= self.window_size:
+            return [(body, 0)]
+
+        starts = [int(s) for s in self.splitter.spans(body, min_length=-1, max_length=len(body) + 1).spans[:, 0]]
+        starts[0] = 0
+        cuts = [0]
+
+        for start in starts[1:]:
+            if start - cuts[-1] >= self.window_size:
+                cuts.append(start)
+
+        cuts.append(len(body))
+        windows = []
+
+        for core, end in zip(cuts, cuts[1:]):
+            context = starts[bisect_left(starts, core - self.overlap)]
+            windows.append((body[context:end], core - context))
+
+        return windows
+
+    def resolve(self, body: str) -> List[str]:
+        """
+        Resolves the coreferences of the body in a single parse per window.
+
+        :param body: The raw string body.
+        :return: The resolved sentences with their whitespace, joining back into the resolved body.
+        """
+        windows = self.windows(body)
+
+        if self.n_process > 1 and len(windows) > 1:
+            resolved = list(self._pool().map(_resolve_worker, windows))
+        else:
+            resolved = [_resolve_window(self.nlp, text, core_start) for text, core_start in windows]
+
+        return [sentence for sentences in resolved for sentence in sentences]
+
+    def _resolved_spans(self, body: str, min_length: int, max_length: int) -> SentenceSpans:
+        """
+        Resolves the body and keeps the offsets of the resolved sentences that pass the length filter.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: The sentence spans into the resolved text.
+        """
+        sentences = self.resolve(body)
+        offsets = array('q')
+        position = 0
+
+        for sentence in sentences:
+            text = sentence.strip()
+
+            if max_length > len(text) > min_length:
+                start = position + len(sentence) - len(sentence.lstrip())
+                offsets.extend((start, start + len(text)))
+
+            position += len(sentence)
+
+        return SentenceSpans(''.join(sentences), offsets)
+
     def process(self, body: str, min_length: int = 40, max_length: int = 600) -> List[str]:
         """
         Processes the content sentences.
@@ -34,8 +223,15 @@ class CoreferenceHandler(SentenceABC):
         :param max_length: Max length that the sentences mus fall under
         :return: Returns a list of sentences.
         """
-        doc = self.nlp(body)._.coref_resolved
-        doc = self.nlp(doc)
-        return [c.string.strip()
-                for c in doc.sents
-                if max_length > len(c.string.strip()) > min_length]
+        return list(self._resolved_spans(body, min_length, max_length))
+
+    def spans(self, body: str, min_length: int = 40, max_length: int = 600) -> SentenceSpans:
+        """
+        Processes the content sentences into character offsets. The offsets point into the resolved text.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: Returns the sentence spans.
+        """
+        return self._resolved_spans(body, min_length, max_length)
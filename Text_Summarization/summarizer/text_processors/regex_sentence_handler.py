@@ -0,0 +1,121 @@
+import re
+from typing import List
+
+from summarizer.text_processors.sentence_abc import SentenceABC
+from summarizer.text_processors.sentence_spans import SentenceSpans
+
+
+class RegexSentenceHandler(SentenceABC):
+    """
+    Dependency free sentence handler for latency critical paths.
+
+    It splits on the same punctuation as the spacy sentencizer with a precompiled regular expression, and filters
+    and returns sentences the same way as the SentenceHandler.
+    """
+
+    # terminal punctuation, then any closing quotes or brackets, then whitespace or the end of the text.
+    BOUNDARY = re.compile(r'[.!?…‼⁇-⁉。！？]+[\'")\]}’”]*(?=\s|$)')
+    ABBREVIATIONS = frozenset([
+        'mr', 'mrs', 'ms', 'dr', 'prof', 'jr', 'st', 'mt', 'vs', 'e.g', 'i.e', 'inc', 'ltd', 'co',
+        'corp', 'jan', 'feb', 'mar', 'apr', 'jun', 'jul', 'aug', 'sep', 'sept', 'oct', 'nov', 'dec', 'u.s',
+    ])
+    # Common words that are only abbreviations before a number, as in "No. 5".
+    NUMBER_ABBREVIATIONS = frozenset(['no'])
+    NUMBER_AFTER = re.compile(r'\.\s*\d')
+
+    def __init__(self):
+        """Regex Sentence Handler. It needs no spacy pipeline."""
+        super().__init__(None, is_spacy_3=True)
+
+    def _is_abbreviation(self, body: str, position: int) -> bool:
+        """
+        Checks whether the period at the given offset belongs to an abbreviation or an initial.
+
+        :param body: The raw string body.
+        :param position: The offset of the punctuation match.
+        :return: Whether the match should not end a sentence.
+        """
+        if body[position] != '.':
+            return False
+
+        words = body[max(0, position - 12):position].split()
+
+        if not words or body[position - 1:position].isspace():
+            return False
+
+        word = words[-1].lstrip('(["\'').lower()
+
+        if word in self.NUMBER_ABBREVIATIONS:
+            return self.NUMBER_AFTER.match(body, position) is not None
+
+        return word in self.ABBREVIATIONS or (len(word) == 1 and word.isalpha())
+
+    def _offsets(self, body: str, min_length: int, max_length: int) -> List[int]:
+        """
+        Splits the body into the flat start, end offsets of the sentences that pass the length filter.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: The flat offsets of the stripped sentences.
+        """
+        offsets = []
+        start = 0
+
+        for match in self.BOUNDARY.finditer(body):
+            if self._is_abbreviation(body, match.start()):
+                continue
+
+            self._append(body, start, match.end(), min_length, max_length, offsets)
+            start = match.end()
+
+        self._append(body, start, len(body), min_length, max_length, offsets)
+        return offsets
+
+    @staticmethod
+    def _append(body: str, start: int, end: int, min_length: int, max_length: int, offsets: List[int]):
+        """
+        Strips a candidate sentence and keeps its offsets if it passes the length filter.
+
+        :param body: The raw string body.
+        :param start: The start offset of the candidate.
+        :param end: The end offset of the candidate.
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :param offsets: The flat offsets to append to.
+        """
+        while start < end and body[start].isspace():
+            start += 1
+
+        while end > start and body[end - 1].isspace():
+            end -= 1
+
+        if max_length > end - start > min_length:
+            offsets.extend((start, end))
+
+    def process(
+        self, body: str, min_length: int = 40, max_length: int = 600
+    ) -> List[str]:
+        """
+        Processes the content sentences.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: Returns a list of sentences.
+        """
+        offsets = self._offsets(body, min_length, max_length)
+        return [body[offsets[i]:offsets[i + 1]] for i in range(0, len(offsets), 2)]
+
+    def spans(
+        self, body: str, min_length: int = 40, max_length: int = 600
+    ) -> SentenceSpans:
+        """
+        Processes the content sentences into character offsets.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: Returns the sentence spans.
+        """
+        return SentenceSpans(body, self._offsets(body, min_length, max_length))
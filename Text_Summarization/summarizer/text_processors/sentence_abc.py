@@ -1,12 +1,18 @@
-from typing import List
+from array import array
+from typing import TYPE_CHECKING, Iterable, Iterator, List
 
-from spacy.language import Language
+import numpy as np
+
+from summarizer.text_processors.sentence_spans import SentenceSpans
+
+if TYPE_CHECKING:
+    from spacy.language import Language
 
 
 class SentenceABC:
     """Parent Class for sentence processing."""
 
-    def __init__(self, nlp: Language, is_spacy_3: bool):
+    def __init__(self, nlp: 'Language', is_spacy_3: bool):
         """
         Base Sentence Handler with Spacy support.
 
@@ -39,6 +45,29 @@ class SentenceABC:
 
         return to_return
 
+    def span_processor(
+        self, doc, min_length: int = 40, max_length: int = 600
+    ) -> SentenceSpans:
+        """
+        Processes a given spacy document into the character offsets of its sentences, without copying them.
+
+        :param doc: The document to use from spacy.
+        :param min_length: The minimum length a sentence should be to be considered.
+        :param max_length: The maximum length a sentence should be to be considered.
+        :return: Sentence spans into the document text.
+        """
+        offsets = array('q')
+
+        for c in doc.sents:
+            text = c.text
+            stripped = text.strip()
+
+            if max_length > len(stripped) > min_length:
+                start = c.start_char + len(text) - len(text.lstrip())
+                offsets.extend((start, start + len(stripped)))
+
+        return SentenceSpans(doc.text, np.frombuffer(offsets, dtype=np.int64) if offsets else [])
+
     def process(
         self, body: str, min_length: int = 40, max_length: int = 600
     ) -> List[str]:
@@ -52,6 +81,60 @@ class SentenceABC:
         """
         raise NotImplementedError()
 
+    def spans(
+        self, body: str, min_length: int = 40, max_length: int = 600
+    ) -> SentenceSpans:
+        """
+        Processes the content sentences into character offsets.
+
+        :param body: The raw string body to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :return: Returns the sentence spans.
+        """
+        return self.span_processor(self.nlp(body), min_length, max_length)
+
+    def stream(
+        self,
+        bodies: Iterable[str],
+        min_length: int = 40,
+        max_length: int = 600,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> Iterator[List[str]]:
+        """
+        Lazily processes the content sentences of many bodies, yielding them body by body.
+
+        :param bodies: The raw string bodies to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :param batch_size: The number of bodies the pipeline processes together.
+        :param n_process: The number of processes to split with.
+        :return: Yields a list of sentences per body.
+        """
+        for body in bodies:
+            yield self.process(body, min_length, max_length)
+
+    def process_many(
+        self,
+        bodies: Iterable[str],
+        min_length: int = 40,
+        max_length: int = 600,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> List[List[str]]:
+        """
+        Processes the content sentences of many bodies.
+
+        :param bodies: The raw string bodies to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :param batch_size: The number of bodies the pipeline processes together.
+        :param n_process: The number of processes to split with.
+        :return: Returns a list of sentences per body.
+        """
+        return list(self.stream(bodies, min_length, max_length, batch_size, n_process))
+
     def __call__(
         self, body: str, min_length: int = 40, max_length: int = 600
     ) -> List[str]:
@@ -1,19 +1,28 @@
-from typing import List
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator, List, Type
 
-from spacy.lang.en import English
-from spacy.language import Language
 from summarizer.text_processors.sentence_abc import SentenceABC
 
+if TYPE_CHECKING:
+    from spacy.language import Language
+
 
 class SentenceHandler(SentenceABC):
     """Basic Sentence Handler."""
 
-    def __init__(self, language: Language = English):
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self, language: Type['Language'] = None):
         """
         Base Sentence Handler with Spacy support.
 
-        :param language: Determines the language to use with spacy.
+        :param language: Determines the language to use with spacy. Defaults to English.
         """
+        if language is None:
+            from spacy.lang.en import English
+            language = English
+
         nlp = language()
 
         is_spacy_3 = False
@@ -27,6 +36,19 @@ class SentenceHandler(SentenceABC):
 
         super().__init__(nlp, is_spacy_3)
 
+    @classmethod
+    def default(cls) -> 'SentenceHandler':
+        """
+        Retrieves the shared English handler used when summarizers are not given one. It is built on first use.
+
+        :return: The handler.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+            return cls._default
+
     def process(
         self, body: str, min_length: int = 40, max_length: int = 600
     ) -> List[str]:
@@ -40,3 +62,25 @@ class SentenceHandler(SentenceABC):
         """
         doc = self.nlp(body)
         return self.sentence_processor(doc, min_length, max_length)
+
+    def stream(
+        self,
+        bodies: Iterable[str],
+        min_length: int = 40,
+        max_length: int = 600,
+        batch_size: int = 64,
+        n_process: int = 1,
+    ) -> Iterator[List[str]]:
+        """
+        Lazily processes the content sentences of many bodies through spacy's nlp.pipe, yielding them body by body.
+        With several processes, the next bodies are split while the caller works on the current ones.
+
+        :param bodies: The raw string bodies to process
+        :param min_length: Minimum length that the sentences must be
+        :param max_length: Max length that the sentences mus fall under
+        :param batch_size: The number of bodies the pipeline processes together.
+        :param n_process: The number of processes to split with.
+        :return: Yields a list of sentences per body.
+        """
+        for doc in self.nlp.pipe(bodies, batch_size=batch_size, n_process=n_process):
+            yield self.sentence_processor(doc, min_length, max_length)
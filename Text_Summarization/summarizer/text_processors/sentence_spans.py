@@ -0,0 +1,59 @@
+from typing import Iterator, List, Sequence, Tuple, Union
+
+import numpy as np
+
+
+class SentenceSpans(Sequence):
+    """
+    Sentences stored as (start, end) character offsets into the text they were split from.
+
+    The offsets live in one flat integer array, and the text of a sentence is only sliced out of the body
+    when it is indexed, so only the sentences that are actually used get materialized.
+    """
+
+    def __init__(self, body: str, offsets: Union[Sequence[int], np.ndarray]):
+        """
+        Sentence Spans constructor.
+
+        :param body: The text the offsets point into.
+        :param offsets: The flat start, end, start, end, ... character offsets.
+        """
+        self.body = body
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+
+    @property
+    def spans(self) -> np.ndarray:
+        """The offsets as a (sentences, 2) view."""
+        return self.offsets.reshape(-1, 2)
+
+    def span(self, i: int) -> Tuple[int, int]:
+        """
+        Retrieves the offsets of one sentence.
+
+        :param i: The sentence index.
+        :return: The start and end character offsets.
+        """
+        return int(self.offsets[2 * i]), int(self.offsets[2 * i + 1])
+
+    def __len__(self) -> int:
+        return len(self.offsets) // 2
+
+    def __getitem__(self, i: Union[int, slice]) -> Union[str, List[str]]:
+        if isinstance(i, slice):
+            return [self[j] for j in range(*i.indices(len(self)))]
+
+        if i < 0:
+            i += len(self)
+
+        if not 0 <= i < len(self):
+            raise IndexError('sentence index out of range')
+
+        start, end = self.span(i)
+        return self.body[start:end]
+
+    def __iter__(self) -> Iterator[str]:
+        for i in range(len(self)):
+            yield self[i]
+
+    def __repr__(self) -> str:
+        return f'SentenceSpans({len(self)} sentences)'
@@ -0,0 +1,113 @@
+from typing import Dict, List
+
+import numpy as np
+from numpy import ndarray
+
+
+class TokenBudgetScheduler:
+    """Length bucketing scheduler that forms embedding batches under a max tokens budget."""
+
+    def __init__(self, max_tokens: int = 4096, max_batch_size: int = None):
+        """
+        Token Budget Scheduler Constructor.
+
+        :param max_tokens: The max number of padded tokens (batch rows * longest row) a batch may hold.
+        :param max_batch_size: Optional cap on the number of sentences in a batch.
+        """
+        assert max_tokens > 0, "max_tokens must be a positive integer"
+
+        self.max_tokens = max_tokens
+        self.max_batch_size = max_batch_size
+        self.reset()
+
+    def reset(self):
+        """Resets the padding statistics."""
+        self.real_tokens = 0
+        self.padded_tokens = 0
+        self.num_batches = 0
+        self.num_sentences = 0
+
+    def schedule(self, lengths: List[int]) -> List[List[int]]:
+        """
+        Sorts the sentences by token length and groups them into batches under the token budget.
+        A sentence longer than the budget is given a batch of its own.
+
+        :param lengths: The token length of every sentence, in original order.
+        :return: Batches of original sentence indices.
+        """
+        order = sorted(range(len(lengths)), key=lengths.__getitem__)
+        batches = []
+        current = []
+        longest = 0
+
+        for idx in order:
+            length = max(lengths[idx], 1)
+            full = self.max_batch_size is not None and len(current) >= self.max_batch_size
+
+            # rows are sorted ascending, so this length is the padded width of the batch.
+            if current and (full or length * (len(current) + 1) > self.max_tokens):
+                batches.append(current)
+                self._record(current, longest, lengths)
+                current = []
+
+            current.append(idx)
+            longest = length
+
+        if current:
+            batches.append(current)
+            self._record(current, longest, lengths)
+
+        return batches
+
+    def _record(self, batch: List[int], longest: int, lengths: List[int]):
+        """
+        Records the padding statistics of a finished batch.
+
+        :param batch: The sentence indices of the batch.
+        :param longest: The padded width of the batch.
+        :param lengths: The token length of every sentence.
+        """
+        self.real_tokens += sum(lengths[i] for i in batch)
+        self.padded_tokens += longest * len(batch)
+        self.num_batches += 1
+        self.num_sentences += len(batch)
+
+    @staticmethod
+    def scatter(batches: List[List[int]], results: List[ndarray]) -> ndarray:
+        """
+        Scatters the per batch results back into the original sentence order.
+
+        :param batches: The batches returned by schedule.
+        :param results: One matrix per batch, with one row per sentence of the batch.
+        :return: A matrix with one row per sentence, in original order.
+        """
+        total = sum(len(batch) for batch in batches)
+        matrix = np.empty((total,) + results[0].shape[1:], dtype=results[0].dtype)
+
+        for batch, result in zip(batches, results):
+            matrix[batch] = result
+
+        return matrix
+
+    @property
+    def padding_efficiency(self) -> float:
+        """The share of the computed token positions that were real tokens rather than padding."""
+        if not self.padded_tokens:
+            return 1.0
+
+        return self.real_tokens / self.padded_tokens
+
+    def report(self) -> Dict[str, float]:
+        """
+        Reports the padding statistics since the last reset, to help tune max_tokens per machine.
+
+        :return: A dictionary of the statistics.
+        """
+        return {
+            'max_tokens': self.max_tokens,
+            'batches': self.num_batches,
+            'sentences': self.num_sentences,
+            'real_tokens': self.real_tokens,
+            'padded_tokens': self.padded_tokens,
+            'padding_efficiency': self.padding_efficiency,
+        }
@@ -1,33 +1,70 @@
-from typing import List, Union
+import hashlib
+import importlib
+import os
+from functools import partial
+from typing import TYPE_CHECKING, Dict, List, Optional, Sequence, Tuple, Type, Union
 
 import numpy as np
 import torch
 from numpy import ndarray
-from transformers import (AlbertModel, AlbertTokenizer, BertModel,
-                          BertTokenizer, DistilBertModel, DistilBertTokenizer,
-                          PreTrainedModel, PreTrainedTokenizer, XLMModel,
-                          XLMTokenizer, XLNetModel, XLNetTokenizer)
+
+from summarizer.transformer_embeddings.batch_scheduler import TokenBudgetScheduler
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
+from summarizer.transformer_embeddings.model_registry import ModelRegistry
+from summarizer.transformer_embeddings.quantization import quantize_linear, similarity_report
+from summarizer.transformer_embeddings.traced_backend import TorchScriptBackend
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedModel, PreTrainedTokenizer
+
+
+def resolve_classes(classes: Tuple[Union[str, Type], ...]) -> Tuple[Type, ...]:
+    """
+    Resolves transformers classes given by name. Each model module is only imported when its class is first needed.
+
+    :param classes: Transformers classes, or their names.
+    :return: The classes.
+    """
+    transformers = importlib.import_module('transformers')
+    return tuple(getattr(transformers, cls) if isinstance(cls, str) else cls for cls in classes)
 
 
 class BertEmbedding:
     """Bert Embedding Handler for BERT models."""
 
+    # Fast tokenizers where transformers has them, the slow class is used if the fast one fails to load.
     MODELS = {
-        'bert-base-uncased': (BertModel, BertTokenizer),
-        'bert-large-uncased': (BertModel, BertTokenizer),
-        'xlnet-base-cased': (XLNetModel, XLNetTokenizer),
-        'xlm-mlm-enfr-1024': (XLMModel, XLMTokenizer),
-        'distilbert-base-uncased': (DistilBertModel, DistilBertTokenizer),
-        'albert-base-v1': (AlbertModel, AlbertTokenizer),
-        'albert-large-v1': (AlbertModel, AlbertTokenizer)
+        'bert-base-uncased': ('BertModel', 'BertTokenizerFast'),
+        'bert-large-uncased': ('BertModel', 'BertTokenizerFast'),
+        'xlnet-base-cased': ('XLNetModel', 'XLNetTokenizerFast'),
+        'xlm-mlm-enfr-1024': ('XLMModel', 'XLMTokenizer'),
+        'distilbert-base-uncased': ('DistilBertModel', 'DistilBertTokenizerFast'),
+        'albert-base-v1': ('AlbertModel', 'AlbertTokenizerFast'),
+        'albert-large-v1': ('AlbertModel', 'AlbertTokenizerFast')
     }
+    BACKENDS = ['eager', 'torchscript']
+    # Architectures whose layers take (hidden states, attention mask) and can be run one by one.
+    TRUNCATABLE = ['bert', 'roberta', 'camembert', 'xlm-roberta', 'electra', 'distilbert']
+    BACKEND_BATCH_SIZE = 32
 
     def __init__(
         self,
         model: str,
-        custom_model: PreTrainedModel = None,
-        custom_tokenizer: PreTrainedTokenizer = None,
+        custom_model: 'PreTrainedModel' = None,
+        custom_tokenizer: 'PreTrainedTokenizer' = None,
         gpu_id: int = 0,
+        batch_size: int = None,
+        max_tokens: int = None,
+        cache: EmbeddingCache = None,
+        truncate_layers: bool = False,
+        quantize: bool = False,
+        quantize_check: List[str] = None,
+        backend: str = 'eager',
+        backend_path: str = None,
+        registry: ModelRegistry = None,
+        model_classes: Tuple[Union[str, Type['PreTrainedModel']], Union[str, Type['PreTrainedTokenizer']]] = None,
+        tokenizer_name: str = None,
+        quantize_spec: Tuple[Union[List[int], int], str, bool] = (-2, 'mean', False),
     ):
         """
         Bert Embedding Constructor. Source for Bert embedding processing.
@@ -35,19 +72,49 @@ class BertEmbedding:
         :param model: Model is the string path for the bert weights. If given a keyword, the s3 path will be used.
         :param custom_model: This is optional if a custom bert model is used.
         :param custom_tokenizer: Place to use custom tokenizer.
+        :param gpu_id: GPU device index if CUDA is available.
+        :param batch_size: If set, sentences are embedded in padded mini-batches of this size instead of one by one.
+        :param max_tokens: If set, sentences are sorted by token length and batched under this padded token budget.
+        When both are set, batch_size caps the number of sentences per batch.
+        :param cache: Optional embedding cache. Only the sentences missing from it are run through the model.
+        :param truncate_layers: Whether to stop the forward pass at the deepest hidden layer that is read, skipping
+        the pooler and only keeping the hidden states that are pooled. Used for BERT style and DistilBERT models,
+        other architectures run the full forward pass.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model. This forces the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
+        :param backend: The inference backend. (eager, torchscript) TorchScript traces the model once, checks it
+        against the eager model and embeds in batches through it.
+        :param backend_path: The file the traced model is saved to. When it exists, it is loaded instead, without
+        loading the eager weights. Delete it to export again.
+        :param registry: A model registry to share the weights and tokenizer with other instances. Call release when
+        done with them.
+        :param model_classes: The model and tokenizer classes to load the model with, for models outside of MODELS.
+        Transformers classes can be given by name.
+        :param tokenizer_name: The tokenizer name or path, if it differs from the model.
+        :param quantize_spec: The (hidden, reduce_option, hidden_concat) configuration the quantize check embeds with.
         """
-        base_model, base_tokenizer = self.MODELS.get(model, (None, None))
+        assert backend in self.BACKENDS, f"backend must be one of {self.BACKENDS}"
+
+        base_model, base_tokenizer = resolve_classes(model_classes or self.MODELS.get(model, (None, None)))
+        tokenizer_name = tokenizer_name or model
 
         self.device = torch.device("cpu")
-        if torch.cuda.is_available():
+        if torch.cuda.is_available() and not quantize:
             assert (
                 isinstance(gpu_id, int) and (0 <= gpu_id and gpu_id < torch.cuda.device_count())
             ), f"`gpu_id` must be an integer between 0 to {torch.cuda.device_count() - 1}. But got: {gpu_id}"
 
             self.device = torch.device(f"cuda:{gpu_id}")
 
+        exported = backend == 'torchscript' and backend_path is not None and os.path.exists(backend_path)
+
         if custom_model:
             self.model = custom_model.to(self.device)
+        elif exported:
+            self.model = None
+        elif registry is not None:
+            self.model = registry.acquire(base_model, model, self.device, output_hidden_states=True)
         else:
             self.model = base_model.from_pretrained(
                 model, output_hidden_states=True).to(self.device)
@@ -55,20 +122,194 @@ class BertEmbedding:
         if custom_tokenizer:
             self.tokenizer = custom_tokenizer
         else:
-            self.tokenizer = base_tokenizer.from_pretrained(model)
+            self.tokenizer = self._load_tokenizer(base_tokenizer, tokenizer_name, registry)
+
+        self.registry = registry
+        self._shared = [obj for obj in (self.model, self.tokenizer) if registry is not None and obj in registry]
+
+        if self.model is not None:
+            self.model.eval()
+
+        self.max_length = self._max_length()
+
+        self.batch_size = batch_size
+        self.scheduler = TokenBudgetScheduler(max_tokens, batch_size) if max_tokens else None
+        self.cache = cache
+        self.truncate_layers = truncate_layers
+        # Custom models and tokenizers are identified by what was loaded, not by the model name.
+        self.model_id = model if model and not custom_model and not custom_tokenizer else self._model_id(backend_path)
+        self.quantization_report = None
+        self.quantized = False
+        self.backend = None
+        self.backend_path = backend_path
+
+        if quantize:
+            self.quantize(quantize_check, *quantize_spec)
+
+        if backend == 'torchscript' and exported:
+            self.backend = TorchScriptBackend.load(backend_path, self.device)
+            self._restore_metadata(self.backend.metadata, quantize)
+        elif backend == 'torchscript':
+            self.backend = self.export_backend()
+
+        # The traced model runs padded batches only.
+        if self.backend is not None and not batch_size and not max_tokens:
+            self.batch_size = self.BACKEND_BATCH_SIZE
+
+    def release(self):
+        """Gives the shared model and tokenizer back to the registry. The embedding can not be used afterwards."""
+        for obj in self._shared:
+            self.registry.release(obj)
+
+        self._shared = []
+        self.model = None
+        self.backend = None
+
+    @staticmethod
+    def _load_tokenizer(tokenizer_class: Type, name: str, registry: ModelRegistry = None) -> 'PreTrainedTokenizer':
+        """
+        Loads a tokenizer, falling back to the slow class when a fast tokenizer can not be loaded, for example when
+        converting it needs sentencepiece.
+
+        :param tokenizer_class: The tokenizer class.
+        :param name: The tokenizer name or path.
+        :param registry: A model registry to share the tokenizer through.
+        :return: The tokenizer.
+        """
+        def load(cls: Type) -> 'PreTrainedTokenizer':
+            return registry.acquire_tokenizer(cls, name) if registry is not None else cls.from_pretrained(name)
+
+        slow_name = tokenizer_class.__name__[:-len('Fast')] if tokenizer_class.__name__.endswith('Fast') else None
+
+        try:
+            return load(tokenizer_class)
+        except Exception:
+            if slow_name is None:
+                raise
+
+            return load(resolve_classes((slow_name,))[0])
+
+    def _model_id(self, backend_path: str = None) -> str:
+        """
+        Identifies the loaded model and tokenizer, for the embedding cache.
+
+        :param backend_path: The traced model file, used when only the traced model is loaded.
+        :return: The model class, path and a fingerprint of its config and weights, or the traced file and its
+        modification time, followed by the tokenizer class, path and vocabulary size.
+        """
+        if self.model is None:
+            model_id = f"torchscript:{os.path.abspath(backend_path)}:{int(os.path.getmtime(backend_path))}"
+        else:
+            fingerprint = hashlib.sha1(self.model.config.to_json_string().encode())
+
+            for parameter in self.model.parameters():
+                fingerprint.update(parameter.detach().flatten()[:16].float().cpu().numpy().tobytes())
+
+            model_id = f"{type(self.model).__name__}:{self.model.name_or_path}:{fingerprint.hexdigest()[:16]}"
+
+        return f"{model_id}|{type(self.tokenizer).__name__}:{self.tokenizer.name_or_path}:{len(self.tokenizer)}"
+
+    def _max_length(self) -> Optional[int]:
+        """
+        Finds the longest input the model takes, from the tokenizer and the position embeddings.
+
+        :return: The max number of tokens, or None if it is unbounded.
+        """
+        limits = []
+
+        if self.tokenizer.model_max_length and self.tokenizer.model_max_length < int(1e6):
+            limits.append(self.tokenizer.model_max_length)
+
+        if self.model is not None and getattr(self.model.config, 'max_position_embeddings', None):
+            limits.append(self.model.config.max_position_embeddings)
+
+        return min(limits) if limits else None
+
+    def export_backend(self) -> TorchScriptBackend:
+        """
+        Traces the model into a TorchScript backend, saved to backend_path if set with the model id and
+        quantization state.
+
+        :return: The backend.
+        """
+        return TorchScriptBackend.export(
+            self.model,
+            self.tokenize_batch(['A tracing example.', 'A longer tracing example, padded to another length.']),
+            self.tokenize_batch(['Parity.', 'A parity check batch', 'of another shape than the tracing example.']),
+            self.backend_path,
+            metadata={
+                'model_id': self.model_id,
+                'quantized': self.quantized,
+                'quantization_report': self.quantization_report,
+            },
+        )
+
+    def _restore_metadata(self, metadata: Dict, quantize: bool):
+        """
+        Restores the model id and quantization state of a loaded backend artifact.
+
+        :param metadata: The metadata saved with the artifact. Older artifacts have none.
+        :param quantize: Whether quantization was asked for, used for artifacts without metadata.
+        """
+        self.quantized = metadata.get('quantized', quantize)
+        self.quantization_report = metadata.get('quantization_report')
+
+        if self.quantized:
+            self.device = torch.device("cpu")
+
+        if 'model_id' in metadata:
+            self.model_id = metadata['model_id']
+        elif self.quantized:
+            self.model_id = f"{self.model_id}|int8"
+
+    def quantize(
+        self,
+        check_sentences: List[str] = None,
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+        hidden_concat: bool = False,
+    ) -> Optional[Dict[str, float]]:
+        """
+        Swaps the model for a dynamic int8 quantized copy, on the cpu.
+
+        :param check_sentences: Sentences embedded with both the float and the quantized model.
+        :param hidden: The hidden layer(s) used for the check.
+        :param reduce_option: The reduce option used for the check.
+        :param hidden_concat: Whether or not to concat multiple hidden layers for the check.
+        :return: The similarity report of the check, if sentences were given.
+        """
+        if self.model is None:
+            # A loaded backend artifact is used as it was saved.
+            return self.quantization_report
+
+        reference = None
+
+        if check_sentences:
+            reference = self._create_matrix(check_sentences, hidden, reduce_option, hidden_concat)
 
-        self.model.eval()
+        self.device = torch.device("cpu")
+        self.model = quantize_linear(self.model)
+        self.model_id = f"{self.model_id}|int8"
+        self.quantized = True
+
+        if reference is not None:
+            self.quantization_report = similarity_report(
+                reference, self._create_matrix(check_sentences, hidden, reduce_option, hidden_concat)
+            )
+
+        if self.backend is not None:
+            self.backend = self.export_backend()
+
+        return self.quantization_report
 
     def tokenize_input(self, text: str) -> torch.tensor:
         """
         Tokenizes the text input.
 
         :param text: Text to tokenize.
-        :return: Returns a torch tensor.
+        :return: Returns a torch tensor, truncated to the max length of the model.
         """
-        tokenized_text = self.tokenizer.tokenize(text)
-        indexed_tokens = self.tokenizer.convert_tokens_to_ids(tokenized_text)
-        return torch.tensor([indexed_tokens]).to(self.device)
+        return self.pad_batch(self.tokenize_ids([text]))[0]
 
     def _pooled_handler(self, hidden: torch.Tensor,
                         reduce_option: str) -> torch.Tensor:
@@ -88,6 +329,276 @@ class BertEmbedding:
 
         return hidden.mean(dim=1).squeeze()
 
+    def tokenize_ids(self, texts: List[str]) -> List[List[int]]:
+        """
+        Tokenizes the texts into lists of token ids, without padding, truncated to the max length of the model.
+
+        :param texts: Texts to tokenize.
+        :return: Returns a list of token ids per text.
+        """
+        if getattr(self.tokenizer, 'is_fast', False):
+            return self.tokenizer(
+                list(texts), add_special_tokens=False, truncation=self.max_length is not None,
+                max_length=self.max_length, return_attention_mask=False, return_token_type_ids=False,
+            )['input_ids']
+
+        return [
+            self.tokenizer.convert_tokens_to_ids(self.tokenizer.tokenize(text))[:self.max_length] for text in texts
+        ]
+
+    def pad_batch(self, indexed: List[List[int]]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Right pads lists of token ids into an id tensor and its attention mask.
+
+        :param indexed: The token ids per text.
+        :return: Returns a tuple of the input ids and the attention mask.
+        """
+        pad_id = self.tokenizer.pad_token_id if self.tokenizer.pad_token_id is not None else 0
+        max_len = max(len(ids) for ids in indexed)
+
+        pin = self.device.type == 'cuda'
+
+        input_ids = torch.full((len(indexed), max_len), pad_id, dtype=torch.long, pin_memory=pin)
+        attention_mask = torch.zeros((len(indexed), max_len), dtype=torch.long, pin_memory=pin)
+
+        for i, ids in enumerate(indexed):
+            input_ids[i, :len(ids)] = torch.tensor(ids, dtype=torch.long)
+            attention_mask[i, :len(ids)] = 1
+
+        return input_ids.to(self.device, non_blocking=pin), attention_mask.to(self.device, non_blocking=pin)
+
+    def tokenize_batch(self, texts: List[str]) -> Tuple[torch.Tensor, torch.Tensor]:
+        """
+        Tokenizes a batch of texts into a right padded id tensor and its attention mask.
+
+        :param texts: Texts to tokenize.
+        :return: Returns a tuple of the input ids and the attention mask.
+        """
+        fast = getattr(self.tokenizer, 'is_fast', False) and self.tokenizer.pad_token_id is not None
+
+        if fast and self.tokenizer.padding_side == 'right' and texts:
+            encoded = self.tokenizer(
+                list(texts), add_special_tokens=False, padding=True, truncation=self.max_length is not None,
+                max_length=self.max_length, return_token_type_ids=False, return_tensors='pt',
+            )
+            pin = self.device.type == 'cuda'
+
+            return tuple(
+                (encoded[key].pin_memory() if pin else encoded[key]).to(self.device, non_blocking=pin)
+                for key in ('input_ids', 'attention_mask')
+            )
+
+        return self.pad_batch(self.tokenize_ids(texts))
+
+    def _encoder_layers(self) -> Optional[torch.nn.ModuleList]:
+        """
+        Retrieves the transformer layers of a BERT style or DistilBERT model, which can be run one by one.
+
+        :return: The layers, or None if the architecture must run its full forward pass.
+        """
+        model_type = getattr(self.model.config, 'model_type', None)
+
+        if model_type not in self.TRUNCATABLE or not hasattr(self.model, 'embeddings'):
+            return None
+
+        for stack in ('encoder', 'transformer'):
+            layers = getattr(getattr(self.model, stack, None), 'layer', None)
+
+            if isinstance(layers, torch.nn.ModuleList):
+                return layers
+
+        return None
+
+    @staticmethod
+    def _read_layers(hidden: Union[List[int], int], reduce_option: str, n_states: int) -> List[int]:
+        """
+        Lists the hidden states read by the pooling options.
+
+        :param hidden: The hidden layer(s) to use for a readout handler.
+        :param reduce_option: How we should reduce the items.
+        :param n_states: The number of hidden states, the embedding output included.
+        :return: The positive indices of the hidden states that are read.
+        """
+        if reduce_option in ('concat_last_4', 'reduce_last_4'):
+            layers = [-1, -2, -3, -4]
+        elif type(hidden) == int:
+            layers = [hidden]
+        else:
+            layers = list(hidden)
+
+        return sorted({i % n_states for i in layers})
+
+    @staticmethod
+    def _spec_layers(specs: List[Tuple[Union[List[int], int], str, bool]]) -> List[int]:
+        """
+        Lists the hidden states read by any of the pooling configurations.
+
+        :param specs: The (hidden, reduce_option, hidden_concat) configurations.
+        :return: The indices of the hidden states that are read, as given.
+        """
+        layers = []
+
+        for hidden, reduce_option, _ in specs:
+            if reduce_option in ('concat_last_4', 'reduce_last_4'):
+                layers.extend([-1, -2, -3, -4])
+            elif type(hidden) == int:
+                layers.append(hidden)
+            else:
+                layers.extend(hidden)
+
+        return layers
+
+    def _hidden_states(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor = None,
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+    ) -> Sequence[Optional[torch.Tensor]]:
+        """
+        Runs the forward pass through the backend, or stopping at the deepest read layer when truncate_layers is set.
+
+        :param input_ids: The input ids.
+        :param attention_mask: The attention mask of the input ids, if padded.
+        :param hidden: The hidden layer(s) to use for a readout handler.
+        :param reduce_option: How we should reduce the items.
+        :return: The hidden states, indexed like the full output. States that are not read are None.
+        """
+        if self.backend is not None:
+            return self.backend(input_ids, torch.ones_like(input_ids) if attention_mask is None else attention_mask)
+
+        layers = self._encoder_layers() if self.truncate_layers else None
+
+        if layers is None:
+            return self.model(input_ids, attention_mask=attention_mask)[-1]
+
+        if attention_mask is None:
+            attention_mask = torch.ones_like(input_ids)
+
+        read = self._read_layers(hidden, reduce_option, len(layers) + 1)
+        hidden_states = [None] * (len(layers) + 1)
+        x = self.model.embeddings(input_ids)
+
+        if hasattr(self.model, 'embeddings_project'):
+            x = self.model.embeddings_project(x)
+
+        if hasattr(self.model, 'encoder'):
+            layer_mask = self.model.get_extended_attention_mask(attention_mask, input_ids.shape)
+        else:
+            layer_mask = attention_mask
+
+        for i in range(read[-1] + 1):
+            if i > 0:
+                x = layers[i - 1](x, layer_mask)[0]
+
+            if i in read:
+                hidden_states[i] = x
+
+        return hidden_states
+
+    def _masked_pooled_handler(self, hidden: torch.Tensor, mask: torch.Tensor,
+                               reduce_option: str) -> torch.Tensor:
+        """
+        Handles a padded torch tensor, ignoring the padded positions.
+
+        :param hidden: The hidden torch tensor to process, shaped (batch, tokens, features).
+        :param mask: The boolean token mask, shaped (batch, tokens).
+        :param reduce_option: The reduce option to use, such as mean, etc.
+        :return: Returns a torch tensor shaped (batch, features).
+        """
+        mask = mask.unsqueeze(-1)
+
+        if reduce_option == 'max':
+            return hidden.masked_fill(~mask, float('-inf')).max(dim=1)[0]
+
+        elif reduce_option == 'median':
+            # nanmedian returns the lower median, the same as median does on the unpadded tensor.
+            return hidden.masked_fill(~mask, float('nan')).nanmedian(dim=1)[0]
+
+        return (hidden * mask).sum(dim=1) / mask.sum(dim=1).clamp(min=1)
+
+    def _pool_batch(
+        self,
+        hidden_states: Tuple[torch.Tensor],
+        mask: torch.Tensor,
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+        hidden_concat: bool = False,
+    ) -> torch.Tensor:
+        """
+        Pools the hidden states of a padded batch, mirroring the options of extract_embeddings.
+
+        :param hidden_states: The hidden states returned by the forward pass.
+        :param mask: The boolean token mask, shaped (batch, tokens).
+        :param hidden: The hidden layer(s) to use for a readout handler.
+        :param reduce_option: How we should reduce the items.
+        :param hidden_concat: Whether or not to concat multiple hidden layers.
+        :return: A torch matrix shaped (batch, features).
+        """
+        if reduce_option == 'concat_last_4':
+            last_4 = [hidden_states[i] for i in (-1, -2, -3, -4)]
+            cat_hidden_states = torch.cat(tuple(last_4), dim=-1)
+            return self._masked_pooled_handler(cat_hidden_states, mask, 'mean')
+
+        elif reduce_option == 'reduce_last_4':
+            last_4 = [hidden_states[i] for i in (-1, -2, -3, -4)]
+            return self._masked_pooled_handler(torch.cat(tuple(last_4), dim=1), mask.repeat(1, 4), 'mean')
+
+        elif type(hidden) == int:
+            return self._masked_pooled_handler(hidden_states[hidden], mask, reduce_option)
+
+        elif hidden_concat:
+            last_states = [hidden_states[i] for i in hidden]
+            cat_hidden_states = torch.cat(tuple(last_states), dim=-1)
+            return self._masked_pooled_handler(cat_hidden_states, mask, 'mean')
+
+        last_states = [hidden_states[i] for i in hidden]
+        hidden_s = torch.cat(tuple(last_states), dim=1)
+
+        return self._masked_pooled_handler(hidden_s, mask.repeat(1, len(last_states)), reduce_option)
+
+    def extract_batch_embeddings(
+        self,
+        texts: List[str],
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+        hidden_concat: bool = False,
+    ) -> torch.Tensor:
+        """
+        Extracts the embeddings for a batch of texts with a single padded forward pass.
+
+        :param texts: The texts to extract embeddings for.
+        :param hidden: The hidden layer(s) to use for a readout handler.
+        :param reduce_option: How we should reduce the items.
+        :param hidden_concat: Whether or not to concat multiple hidden layers.
+        :return: A torch matrix with one row per text.
+        """
+        input_ids, attention_mask = self.tokenize_batch(texts)
+        return self._embed_batch(input_ids, attention_mask, hidden, reduce_option, hidden_concat)
+
+    def _embed_batch(
+        self,
+        input_ids: torch.Tensor,
+        attention_mask: torch.Tensor,
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+        hidden_concat: bool = False,
+    ) -> torch.Tensor:
+        """
+        Runs the forward pass over a padded batch and pools it.
+
+        :param input_ids: The padded input ids.
+        :param attention_mask: The attention mask of the input ids.
+        :param hidden: The hidden layer(s) to use for a readout handler.
+        :param reduce_option: How we should reduce the items.
+        :param hidden_concat: Whether or not to concat multiple hidden layers.
+        :return: A torch matrix with one row per text.
+        """
+        with torch.no_grad():
+            hidden_states = self._hidden_states(input_ids, attention_mask, hidden, reduce_option)
+
+        return self._pool_batch(hidden_states, attention_mask.bool(), hidden, reduce_option, hidden_concat)
+
     def extract_embeddings(
         self,
         text: str,
@@ -105,7 +616,10 @@ class BertEmbedding:
         :return: A torch vector.
         """
         tokens_tensor = self.tokenize_input(text)
-        pooled, hidden_states = self.model(tokens_tensor)[-2:]
+        if self.truncate_layers or self.backend is not None:
+            hidden_states = self._hidden_states(tokens_tensor, hidden=hidden, reduce_option=reduce_option)
+        else:
+            pooled, hidden_states = self.model(tokens_tensor)[-2:]
 
         # deprecated temporary keyword functions.
         if reduce_option == 'concat_last_4':
@@ -147,6 +661,110 @@ class BertEmbedding:
         :param hidden_concat: Whether or not to concat multiple hidden layers.
         :return: A numpy array matrix of the given content.
         """
+        if self.cache is not None:
+            namespace = EmbeddingCache.make_namespace(self.model_id, hidden, reduce_option, hidden_concat)
+            return self.cache.embed(
+                namespace, content, partial(
+                    self._create_matrix, hidden=hidden, reduce_option=reduce_option, hidden_concat=hidden_concat
+                )
+            )
+
+        return self._create_matrix(content, hidden, reduce_option, hidden_concat)
+
+    def create_matrices(
+        self,
+        content: List[str],
+        specs: List[Tuple[Union[List[int], int], str, bool]],
+    ) -> List[ndarray]:
+        """
+        Create the matrices of several pooling configurations from a single forward pass over the content.
+
+        :param content: The list of sentences.
+        :param specs: The (hidden, reduce_option, hidden_concat) configurations.
+        :return: One numpy array matrix of the given content per configuration.
+        """
+        specs = [tuple(spec) for spec in specs]
+
+        if self.cache is not None:
+            namespaces = [EmbeddingCache.make_namespace(self.model_id, *spec) for spec in specs]
+            return self.cache.embed_many(namespaces, content, partial(self._create_matrices, specs=specs))
+
+        return self._create_matrices(content, specs)
+
+    def _create_matrices(
+        self,
+        content: List[str],
+        specs: List[Tuple[Union[List[int], int], str, bool]],
+    ) -> List[ndarray]:
+        """
+        Create the matrices of several pooling configurations, running every sentence through the model once.
+        Sentences are batched like in _create_matrix, and one by one when no batching is set.
+
+        :param content: The list of sentences.
+        :param specs: The (hidden, reduce_option, hidden_concat) configurations.
+        :return: One numpy array matrix of the given content per configuration.
+        """
+        if not content:
+            return [self._create_matrix(content, *spec) for spec in specs]
+
+        indexed = self.tokenize_ids(content)
+
+        if self.scheduler:
+            batches = self.scheduler.schedule([len(ids) for ids in indexed])
+        else:
+            size = self.batch_size or 1
+            batches = [list(range(i, min(i + size, len(content)))) for i in range(0, len(content), size)]
+
+        read = self._spec_layers(specs)
+        pooled = [[] for _ in specs]
+
+        for batch in batches:
+            input_ids, attention_mask = self.pad_batch([indexed[i] for i in batch])
+
+            with torch.no_grad():
+                hidden_states = self._hidden_states(input_ids, attention_mask, read)
+
+            for results, (hidden, reduce_option, hidden_concat) in zip(pooled, specs):
+                results.append(self._pool_batch(
+                    hidden_states, attention_mask.bool(), hidden, reduce_option, hidden_concat
+                ).data.cpu().numpy())
+
+        return [TokenBudgetScheduler.scatter(batches, results) for results in pooled]
+
+    def _create_matrix(
+        self,
+        content: List[str],
+        hidden: Union[List[int], int] = -2,
+        reduce_option: str = 'mean',
+        hidden_concat: bool = False,
+    ) -> ndarray:
+        """
+        Create matrix from the embeddings, running every sentence through the model.
+
+        :param content: The list of sentences.
+        :param hidden: Which hidden layer to use.
+        :param reduce_option: The reduce option to run.
+        :param hidden_concat: Whether or not to concat multiple hidden layers.
+        :return: A numpy array matrix of the given content.
+        """
+        if self.scheduler and content:
+            indexed = self.tokenize_ids(content)
+            batches = self.scheduler.schedule([len(ids) for ids in indexed])
+
+            return self.scheduler.scatter(batches, [
+                self._embed_batch(
+                    *self.pad_batch([indexed[i] for i in batch]), hidden=hidden, reduce_option=reduce_option,
+                    hidden_concat=hidden_concat
+                ).data.cpu().numpy() for batch in batches
+            ])
+
+        if self.batch_size and content:
+            return np.vstack([
+                self.extract_batch_embeddings(
+                    content[i:i + self.batch_size], hidden=hidden, reduce_option=reduce_option,
+                    hidden_concat=hidden_concat
+                ).data.cpu().numpy() for i in range(0, len(content), self.batch_size)
+            ])
 
         return np.asarray([
             np.squeeze(self.extract_embeddings(
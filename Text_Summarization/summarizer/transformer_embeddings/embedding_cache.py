@@ -0,0 +1,275 @@
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Callable, Dict, List, Tuple
+
+import numpy as np
+from numpy import ndarray
+
+
+class EmbeddingCache:
+    """
+    Persistent sentence embedding cache.
+
+    Vectors live in an append-only float32 file that is read through a memory map. Every vector has
+    a fixed size record in an append-only index log: a 16 byte key digest, its offset and its length.
+    """
+
+    DATA_FILE = 'vectors.f32'
+    INDEX_FILE = 'index.bin'
+    INDEX_DTYPE = np.dtype([('key', 'S16'), ('offset', '<i8'), ('length', '<i4')])
+
+    def __init__(self, path: str, max_bytes: int = 1 << 30):
+        """
+        Embedding Cache Constructor. A cache directory should only be written by one process at a time.
+
+        :param path: The directory holding the cache files. It is created if missing.
+        :param max_bytes: The max size of the stored vectors. Least recently used vectors are evicted past it.
+        """
+        os.makedirs(path, exist_ok=True)
+
+        self.path = path
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._data_path = os.path.join(path, self.DATA_FILE)
+        self._index_path = os.path.join(path, self.INDEX_FILE)
+        self._lock = threading.RLock()
+        self._mmap = None
+        self._index = OrderedDict()
+        self._live_floats = 0
+
+        if os.path.exists(self._index_path):
+            for key, offset, length in np.fromfile(self._index_path, dtype=self.INDEX_DTYPE):
+                self._set(key, int(offset), int(length))
+
+        self._size = os.path.getsize(self._data_path) // 4 if os.path.exists(self._data_path) else 0
+
+    @staticmethod
+    def make_namespace(*parts) -> str:
+        """
+        Builds the namespace of a model configuration, such as the model identity and its pooling options.
+
+        :param parts: The parts identifying the configuration.
+        :return: The namespace string.
+        """
+        return '|'.join(str(p) for p in parts)
+
+    @staticmethod
+    def make_key(namespace: str, sentence: str) -> bytes:
+        """
+        Hashes a sentence within a namespace.
+
+        :param namespace: The configuration namespace.
+        :param sentence: The sentence.
+        :return: A 16 byte digest.
+        """
+        digest = hashlib.blake2b(namespace.encode('utf-8'), digest_size=16)
+        digest.update(b'\0')
+        digest.update(sentence.encode('utf-8'))
+        return digest.digest()
+
+    def _set(self, key: bytes, offset: int, length: int):
+        """
+        Points a key to a stored vector.
+
+        :param key: The key digest.
+        :param offset: The offset of the vector, in floats.
+        :param length: The length of the vector, in floats.
+        """
+        # numpy strips trailing null bytes from fixed width byte strings.
+        key = bytes(key).ljust(16, b'\0')
+        previous = self._index.pop(key, None)
+
+        if previous is not None:
+            self._live_floats -= previous[1]
+
+        self._index[key] = (offset, length)
+        self._live_floats += length
+
+    def _vectors(self) -> ndarray:
+        """
+        Retrieves the memory map of the stored vectors, remapping it when the file has grown.
+
+        :return: The memory mapped float store.
+        """
+        if self._mmap is None or len(self._mmap) < self._size:
+            self._mmap = np.memmap(self._data_path, dtype=np.float32, mode='r', shape=(self._size,))
+
+        return self._mmap
+
+    def lookup(self, namespace: str, sentences: List[str]) -> Tuple[Dict[int, ndarray], List[int]]:
+        """
+        Looks up the cached vectors of the sentences.
+
+        :param namespace: The configuration namespace.
+        :param sentences: The sentences to look up.
+        :return: A tuple of the found vectors by sentence position and the positions that were missed.
+        """
+        found = {}
+        missing = []
+
+        with self._lock:
+            for i, sentence in enumerate(sentences):
+                key = self.make_key(namespace, sentence)
+                entry = self._index.get(key)
+
+                if entry is None:
+                    missing.append(i)
+                    continue
+
+                self._index.move_to_end(key)
+                offset, length = entry
+                found[i] = np.array(self._vectors()[offset:offset + length])
+
+            self.hits += len(found)
+            self.misses += len(missing)
+
+        return found, missing
+
+    def store(self, namespace: str, sentences: List[str], matrix: ndarray):
+        """
+        Appends the vectors of the sentences to the cache.
+
+        :param namespace: The configuration namespace.
+        :param sentences: The sentences that were embedded.
+        :param matrix: The embedding matrix, with one row per sentence.
+        """
+        matrix = np.ascontiguousarray(matrix, dtype=np.float32).reshape(len(sentences), -1)
+        length = matrix.shape[1]
+
+        with self._lock:
+            records = np.empty(len(sentences), dtype=self.INDEX_DTYPE)
+
+            for i, sentence in enumerate(sentences):
+                records[i] = (self.make_key(namespace, sentence), self._size + i * length, length)
+
+            with open(self._data_path, 'ab') as data:
+                data.write(matrix.tobytes())
+
+            with open(self._index_path, 'ab') as index:
+                index.write(records.tobytes())
+
+            for key, offset, length in records:
+                self._set(key, int(offset), int(length))
+
+            self._size += matrix.size
+
+            if self._live_floats * 4 > self.max_bytes:
+                self._evict()
+
+    def _evict(self):
+        """Evicts the least recently used vectors down to 80% of max_bytes, then compacts the files."""
+        target = int(self.max_bytes * 0.8) // 4
+
+        while self._index and self._live_floats > target:
+            _, (_, length) = self._index.popitem(last=False)
+            self._live_floats -= length
+            self.evictions += 1
+
+        self._compact()
+
+    def _compact(self):
+        """Rewrites the cache files with only the live vectors, in least recently used order."""
+        vectors = self._vectors()
+        records = np.empty(len(self._index), dtype=self.INDEX_DTYPE)
+        offset = 0
+
+        with open(self._data_path + '.tmp', 'wb') as data:
+            for i, (key, (old_offset, length)) in enumerate(self._index.items()):
+                data.write(np.asarray(vectors[old_offset:old_offset + length]).tobytes())
+                records[i] = (key, offset, length)
+                offset += length
+
+        records.tofile(self._index_path + '.tmp')
+
+        # Mapped files can not be replaced on Windows. Lookups copy their vectors out, so dropping the last
+        # references to the memory map closes it.
+        del vectors
+        self._mmap = None
+        os.replace(self._data_path + '.tmp', self._data_path)
+        os.replace(self._index_path + '.tmp', self._index_path)
+
+        self._index = OrderedDict()
+        self._live_floats = 0
+        self._size = offset
+
+        for key, offset, length in records:
+            self._set(key, int(offset), int(length))
+
+    def embed(self, namespace: str, sentences: List[str], compute: Callable[[List[str]], ndarray]) -> ndarray:
+        """
+        Builds the embedding matrix of the sentences, only computing the cache misses.
+
+        :param namespace: The configuration namespace.
+        :param sentences: The sentences to embed.
+        :param compute: The callable embedding a list of sentences into a matrix.
+        :return: A numpy array matrix of the given sentences.
+        """
+        if not sentences:
+            return compute(sentences)
+
+        found, missing = self.lookup(namespace, sentences)
+
+        if missing:
+            misses = [sentences[i] for i in missing]
+            computed = compute(misses)
+            self.store(namespace, misses, computed)
+            found.update(zip(missing, computed))
+
+        return np.asarray([found[i] for i in range(len(sentences))], dtype=np.float32)
+
+    def embed_many(
+        self,
+        namespaces: List[str],
+        sentences: List[str],
+        compute: Callable[[List[str]], List[ndarray]],
+    ) -> List[ndarray]:
+        """
+        Builds the embedding matrices of the sentences under several namespaces, computing the sentences missed
+        in any of them with a single call.
+
+        :param namespaces: The configuration namespaces.
+        :param sentences: The sentences to embed.
+        :param compute: The callable embedding a list of sentences into one matrix per namespace.
+        :return: One numpy array matrix of the given sentences per namespace.
+        """
+        if not sentences:
+            return compute(sentences)
+
+        lookups = [self.lookup(namespace, sentences) for namespace in namespaces]
+        missing = sorted(set().union(*(misses for _, misses in lookups)))
+
+        if missing:
+            rows = {i: row for row, i in enumerate(missing)}
+            computed = compute([sentences[i] for i in missing])
+
+            for namespace, (found, misses), matrix in zip(namespaces, lookups, computed):
+                if misses:
+                    self.store(namespace, [sentences[i] for i in misses], matrix[[rows[i] for i in misses]])
+                    found.update((i, matrix[rows[i]]) for i in misses)
+
+        return [np.asarray([found[i] for i in range(len(sentences))], dtype=np.float32) for found, _ in lookups]
+
+    def stats(self) -> Dict[str, float]:
+        """
+        Reports the cache counters.
+
+        :return: A dictionary of the counters.
+        """
+        lookups = self.hits + self.misses
+
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / lookups if lookups else 0.0,
+            'evictions': self.evictions,
+            'entries': len(self._index),
+            'bytes': self._live_floats * 4,
+        }
+
+    def __len__(self) -> int:
+        return len(self._index)
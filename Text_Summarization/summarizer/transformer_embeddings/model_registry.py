@@ -0,0 +1,182 @@
+import threading
+from typing import Any, Dict, Hashable, List, Tuple
+
+import torch
+
+
+class ModelRegistry:
+    """
+    Process wide registry of transformer models and tokenizers.
+
+    Models are keyed by their name, dtype, device and loading arguments, so every summarizer asking for the same
+    weights gets the same instance. Shared models are in eval mode with gradients disabled, and must be treated as read only.
+    Every acquire must be paired with a release. Released models stay loaded until they are unloaded.
+    """
+
+    _default = None
+    _default_lock = threading.Lock()
+
+    def __init__(self):
+        """Model Registry constructor. Use ModelRegistry.default() for the process wide registry."""
+        self._lock = threading.RLock()
+        self._entries: Dict[Hashable, List] = {}
+
+    @classmethod
+    def default(cls) -> 'ModelRegistry':
+        """
+        Retrieves the process wide registry.
+
+        :return: The registry.
+        """
+        with cls._default_lock:
+            if cls._default is None:
+                cls._default = cls()
+
+            return cls._default
+
+    @staticmethod
+    def make_key(name: str, dtype: torch.dtype = None, device: torch.device = None) -> Tuple[str, str, str]:
+        """
+        Builds the key of a model.
+
+        :param name: The model name or path.
+        :param dtype: The dtype of the weights. None is the dtype they were saved with.
+        :param device: The device of the weights.
+        :return: The key.
+        """
+        return name, str(dtype), str(torch.device(device) if device is not None else torch.device('cpu'))
+
+    def acquire(
+        self,
+        model_class: Any,
+        name: str,
+        device: torch.device = None,
+        dtype: torch.dtype = None,
+        **kwargs
+    ) -> torch.nn.Module:
+        """
+        Retrieves a shared model, loading it on the first acquire.
+
+        :param model_class: The transformers model class to load it with.
+        :param name: The model name or path.
+        :param device: The device to load it on.
+        :param dtype: The dtype to load the weights as.
+        :param kwargs: Extra arguments for from_pretrained, such as output_hidden_states. They are part of the key,
+        since they change the loaded model.
+        :return: The shared model.
+        """
+        key = (
+            ('model', model_class.__name__) + self.make_key(name, dtype, device)
+            + tuple(sorted((arg, repr(value)) for arg, value in kwargs.items()))
+        )
+
+        def load():
+            if dtype is not None:
+                kwargs['torch_dtype'] = dtype
+
+            model = model_class.from_pretrained(name, **kwargs).to(device or torch.device('cpu')).eval()
+            model.requires_grad_(False)
+            return model
+
+        return self._acquire(key, load)
+
+    def acquire_tokenizer(self, tokenizer_class: Any, name: str) -> Any:
+        """
+        Retrieves a shared tokenizer, loading it on the first acquire.
+
+        :param tokenizer_class: The transformers tokenizer class to load it with.
+        :param name: The tokenizer name or path.
+        :return: The shared tokenizer.
+        """
+        key = ('tokenizer', tokenizer_class.__name__, name)
+        return self._acquire(key, lambda: tokenizer_class.from_pretrained(name))
+
+    def _acquire(self, key: Hashable, load) -> Any:
+        """
+        Retrieves an entry, loading it if missing, and takes a reference to it.
+
+        :param key: The entry key.
+        :param load: The callable loading the entry.
+        :return: The entry object.
+        """
+        with self._lock:
+            entry = self._entries.get(key)
+
+            if entry is None:
+                entry = self._entries[key] = [load(), 0]
+
+            entry[1] += 1
+            return entry[0]
+
+    def _find(self, obj: Any) -> Hashable:
+        """
+        Finds the key of a registered object.
+
+        :param obj: The model or tokenizer.
+        :return: Its key, or None if it is not registered.
+        """
+        for key, (registered, _) in self._entries.items():
+            if registered is obj:
+                return key
+
+        return None
+
+    def release(self, obj: Any) -> int:
+        """
+        Gives back a reference to a model or tokenizer. Objects that are not registered are ignored.
+
+        :param obj: The acquired model or tokenizer.
+        :return: The number of references left.
+        """
+        with self._lock:
+            key = self._find(obj)
+
+            if key is None:
+                return 0
+
+            entry = self._entries[key]
+            entry[1] = max(0, entry[1] - 1)
+            return entry[1]
+
+    def unload(self, obj: Any = None, force: bool = False) -> int:
+        """
+        Drops released entries so that their memory can be freed.
+
+        :param obj: The model or tokenizer to unload. All released entries are unloaded if not given.
+        :param force: Whether to unload entries that are still referenced.
+        :return: The number of unloaded entries.
+        """
+        with self._lock:
+            if obj is not None:
+                key = self._find(obj)
+                keys = [key] if key is not None else []
+            else:
+                keys = list(self._entries)
+
+            keys = [key for key in keys if force or self._entries[key][1] == 0]
+
+            for key in keys:
+                del self._entries[key]
+
+        if keys and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+
+        return len(keys)
+
+    def refcount(self, obj: Any) -> int:
+        """
+        Counts the references to a model or tokenizer.
+
+        :param obj: The model or tokenizer.
+        :return: The number of references, 0 if it is not registered.
+        """
+        with self._lock:
+            key = self._find(obj)
+            return self._entries[key][1] if key is not None else 0
+
+    def __contains__(self, obj: Any) -> bool:
+        with self._lock:
+            return self._find(obj) is not None
+
+    def __len__(self) -> int:
+        return len(self._entries)
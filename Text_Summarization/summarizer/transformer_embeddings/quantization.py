@@ -0,0 +1,39 @@
+import copy
+from typing import Dict
+
+import numpy as np
+import torch
+from numpy import ndarray
+
+
+def quantize_linear(model: torch.nn.Module) -> torch.nn.Module:
+    """
+    Applies dynamic int8 quantization to the linear layers of a model. Quantized models only run on cpu.
+
+    :param model: The float model. It is left untouched, so it can be shared.
+    :return: A quantized copy of the model.
+    """
+    model = copy.deepcopy(model).to(torch.device('cpu')).eval()
+    return torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+
+
+def similarity_report(reference: ndarray, quantized: ndarray) -> Dict[str, float]:
+    """
+    Compares the embeddings of the quantized model with the ones of the float model.
+
+    :param reference: The float embedding matrix.
+    :param quantized: The quantized embedding matrix of the same sentences.
+    :return: The cosine similarity statistics of the row pairs, and the max absolute difference.
+    """
+    reference = np.asarray(reference, dtype=np.float32)
+    quantized = np.asarray(quantized, dtype=np.float32)
+
+    norms = np.linalg.norm(reference, axis=1) * np.linalg.norm(quantized, axis=1)
+    cosine = (reference * quantized).sum(axis=1) / np.maximum(norms, 1e-12)
+
+    return {
+        'sentences': len(cosine),
+        'mean_cosine': float(cosine.mean()),
+        'min_cosine': float(cosine.min()),
+        'max_abs_diff': float(np.abs(reference - quantized).max()),
+    }
@@ -1,22 +1,56 @@
-from typing import List
+from typing import Dict, List, Optional
 
 import numpy as np
 import torch
 from sentence_transformers import SentenceTransformer
 
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
+from summarizer.transformer_embeddings.quantization import quantize_linear, similarity_report
+
 
 class SBertEmbedding:
     """SBert Embedding. This is for the SentenceTransformer Package."""
 
-    def __init__(self, model: str):
+    def __init__(
+        self, model: str, cache: EmbeddingCache = None, quantize: bool = False, quantize_check: List[str] = None
+    ):
         """
         SBert Parent Handler.
 
         :param model: The model string for SentenceTransformer.
+        :param cache: Optional embedding cache. Only the sentences missing from it are run through the model.
+        :param quantize: Whether to run a dynamic int8 quantized copy of the model. This forces the cpu.
+        :param quantize_check: Sentences embedded with both the float and the quantized model, to report their
+        similarity in quantization_report.
         """
         self.sbert_model = SentenceTransformer(model)
-        self.device = torch.device("cuda" if torch.cuda.is_available() else "cpu")
+        self.device = torch.device("cuda" if torch.cuda.is_available() and not quantize else "cpu")
         self.sbert_model.to(self.device)
+        self.model_id = model
+        self.cache = cache
+        self.quantization_report = None
+
+        if quantize:
+            self.quantize(quantize_check)
+
+    def quantize(self, check_sentences: List[str] = None) -> Optional[Dict[str, float]]:
+        """
+        Swaps the model for a dynamic int8 quantized copy, on the cpu.
+
+        :param check_sentences: Sentences embedded with both the float and the quantized model.
+        :return: The similarity report of the check, if sentences were given.
+        """
+        self.device = torch.device("cpu")
+        self.sbert_model.to(self.device)
+        reference = self.sbert_model.encode(check_sentences) if check_sentences else None
+
+        self.sbert_model = quantize_linear(self.sbert_model)
+        self.model_id = f"{self.model_id}|int8"
+
+        if reference is not None:
+            self.quantization_report = similarity_report(reference, self.sbert_model.encode(check_sentences))
+
+        return self.quantization_report
 
     def extract_embeddings(self, sentences: List[str]) -> np.ndarray:
         """
@@ -25,6 +59,11 @@ class SBertEmbedding:
         :param sentences: The sentences to summarizer.
         :return Numpy array of sentences.
         """
+        if self.cache is not None:
+            return self.cache.embed(
+                EmbeddingCache.make_namespace('sbert', self.model_id), sentences, self.sbert_model.encode
+            )
+
         embeddings = self.sbert_model.encode(sentences)
         return embeddings
 
@@ -0,0 +1,117 @@
+import json
+from typing import TYPE_CHECKING, Any, Dict, Tuple
+
+import torch
+
+if TYPE_CHECKING:
+    from transformers import PreTrainedModel
+
+
+class HiddenStates(torch.nn.Module):
+    """Wraps a transformer model so that its forward pass returns its hidden states as one stacked tensor."""
+
+    def __init__(self, model: 'PreTrainedModel'):
+        """
+        Hidden States wrapper.
+
+        :param model: A transformer model built with output_hidden_states.
+        """
+        super().__init__()
+        self.model = model
+
+    def forward(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Runs the model.
+
+        :param input_ids: The padded input ids.
+        :param attention_mask: The attention mask of the input ids.
+        :return: The hidden states, shaped (states, batch, tokens, features).
+        """
+        return torch.stack(self.model(input_ids, attention_mask=attention_mask, return_dict=False)[-1])
+
+
+class TorchScriptBackend:
+    """
+    TorchScript inference backend.
+
+    The model is traced once into a TorchScript module that can be saved, and later loaded without the
+    eager model or its python code. The saved file carries json metadata about the model it was traced from.
+    """
+
+    METADATA_FILE = 'metadata.json'
+
+    def __init__(self, module: torch.jit.ScriptModule, metadata: Dict[str, Any] = None):
+        """
+        TorchScript Backend constructor. Use export or load to build one.
+
+        :param module: The traced module.
+        :param metadata: The metadata saved with the module.
+        """
+        self.module = module
+        self.metadata = metadata or {}
+
+    @classmethod
+    def export(
+        cls,
+        model: 'PreTrainedModel',
+        example: Tuple[torch.Tensor, torch.Tensor],
+        check: Tuple[torch.Tensor, torch.Tensor],
+        path: str = None,
+        atol: float = 1e-4,
+        metadata: Dict[str, Any] = None,
+    ) -> 'TorchScriptBackend':
+        """
+        Traces a model, checks it against the eager model and optionally saves it.
+
+        :param model: The eager model.
+        :param example: The input ids and attention mask to trace with.
+        :param check: An input of another shape, compared between the traced and the eager model.
+        :param path: The file to save the traced module to.
+        :param atol: The tolerance of the parity check.
+        :param metadata: Json serializable metadata saved with the module. A quantized entry keeps it on the cpu
+        when loaded.
+        :return: The backend.
+        """
+        wrapper = HiddenStates(model).eval()
+
+        with torch.no_grad():
+            module = torch.jit.trace(wrapper, example, check_trace=False, strict=False)
+            expected = wrapper(*check)
+            result = module(*check)
+
+        if result.shape != expected.shape or not torch.allclose(result, expected, atol=atol):
+            raise ValueError("The traced model does not match the eager model")
+
+        if path is not None:
+            torch.jit.save(module, path, _extra_files={cls.METADATA_FILE: json.dumps(metadata or {})})
+
+        return cls(module, metadata)
+
+    @classmethod
+    def load(cls, path: str, device: torch.device) -> 'TorchScriptBackend':
+        """
+        Loads a saved backend. Quantized modules stay on the cpu, they have no gpu kernels.
+
+        :param path: The saved traced module.
+        :param device: The device to load it on.
+        :return: The backend.
+        """
+        files = {cls.METADATA_FILE: ''}
+        module = torch.jit.load(path, map_location=torch.device('cpu'), _extra_files=files).eval()
+        metadata = json.loads(files[cls.METADATA_FILE] or '{}')
+
+        if not metadata.get('quantized'):
+            module = module.to(device)
+
+        return cls(module, metadata)
+
+    def __call__(self, input_ids: torch.Tensor, attention_mask: torch.Tensor) -> torch.Tensor:
+        """
+        Runs the traced module.
+
+        :param input_ids: The padded input ids.
+        :param attention_mask: The attention mask of the input ids.
+        :return: The hidden states, shaped (states, batch, tokens, features).
+        """
+        with torch.no_grad():
+            return self.module(input_ids, attention_mask)
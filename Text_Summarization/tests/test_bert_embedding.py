@@ -0,0 +1,344 @@
+import numpy as np
+import pytest
+import torch
+from transformers import (BertConfig, BertModel, BertTokenizer, BertTokenizerFast, DistilBertConfig,
+                          DistilBertModel, ElectraConfig, ElectraModel, LongformerConfig, LongformerModel,
+                          RobertaConfig, RobertaModel)
+
+from summarizer.bert import BertSummarizer, TransformerSummarizer
+from summarizer.transformer_embeddings.batch_scheduler import TokenBudgetScheduler
+from summarizer.transformer_embeddings.bert_embedding import BertEmbedding
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture(scope='module')
+def passage_sentences():
+    return [
+        'The Chrysler Building, the famous art deco New York skyscraper, will be sold.',
+        'The deal was for $150 million.',
+        'Mubadala, an Abu Dhabi investment fund, purchased 90% of the building for $800 million in 2008.',
+        'The buyer is RFR Holding, a New York real estate company.',
+        'The sale was handled by CBRE Group.',
+    ]
+
+
+@pytest.fixture(scope='module')
+def tiny_vocab(tmp_path_factory, passage_sentences):
+    words = set()
+    for sentence in passage_sentences:
+        for ch in ',.$%':
+            sentence = sentence.replace(ch, ' ' + ch + ' ')
+        words.update(sentence.lower().split())
+
+    vocab_file = tmp_path_factory.mktemp('tiny_bert') / 'vocab.txt'
+    vocab_file.write_text('\n'.join(['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]'] + sorted(words)))
+    return str(vocab_file)
+
+
+@pytest.fixture(scope='module')
+def tiny_tokenizer(tiny_vocab):
+    return BertTokenizer(tiny_vocab)
+
+
+@pytest.fixture(scope='module')
+def tiny_fast_tokenizer(tiny_vocab):
+    return BertTokenizerFast(tiny_vocab)
+
+
+@pytest.fixture(scope='module')
+def tiny_model(tiny_tokenizer):
+    config = BertConfig(
+        vocab_size=tiny_tokenizer.vocab_size, hidden_size=32, num_hidden_layers=4,
+        num_attention_heads=4, intermediate_size=64, output_hidden_states=True,
+    )
+    return BertModel(config)
+
+
+@pytest.fixture(scope='module')
+def embedding(tiny_model, tiny_tokenizer):
+    return BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer)
+
+
+@pytest.mark.parametrize('hidden,reduce_option,hidden_concat', [
+    (-2, 'mean', False),
+    (-1, 'max', False),
+    (-2, 'median', False),
+    ([-1, -2], 'mean', False),
+    ([-1, -2], 'median', False),
+    ([-1, -2], 'mean', True),
+    (-2, 'concat_last_4', False),
+    (-2, 'reduce_last_4', False),
+])
+def test_batched_matches_sequential(embedding, passage_sentences, hidden, reduce_option, hidden_concat):
+    embedding.batch_size = None
+    expected = embedding(passage_sentences, hidden, reduce_option, hidden_concat)
+
+    embedding.batch_size = 3
+    result = embedding(passage_sentences, hidden, reduce_option, hidden_concat)
+    embedding.batch_size = None
+
+    assert result.shape == expected.shape
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_token_budget_matches_sequential(embedding, passage_sentences):
+    expected = embedding(passage_sentences)
+
+    embedding.scheduler = TokenBudgetScheduler(max_tokens=40)
+    result = embedding(passage_sentences)
+    embedding.scheduler = None
+
+    np.testing.assert_allclose(result, expected, atol=1e-5)
+
+
+def test_scheduler_budget_and_order():
+    lengths = [30, 5, 12, 7, 30, 6]
+    scheduler = TokenBudgetScheduler(max_tokens=32)
+    batches = scheduler.schedule(lengths)
+
+    assert sorted(i for batch in batches for i in batch) == list(range(len(lengths)))
+    for batch in batches:
+        assert len(batch) == 1 or max(lengths[i] for i in batch) * len(batch) <= 32
+
+    results = [np.asarray([[i] for i in batch]) for batch in batches]
+    np.testing.assert_array_equal(scheduler.scatter(batches, results)[:, 0], np.arange(len(lengths)))
+
+    report = scheduler.report()
+    assert report['real_tokens'] == sum(lengths)
+    assert 0 < report['padding_efficiency'] <= 1.0
+
+
+def test_cached_matches_uncached(embedding, passage_sentences, tmp_path):
+    expected = embedding(passage_sentences)
+
+    embedding.cache = EmbeddingCache(str(tmp_path))
+    embedding(passage_sentences[:2])
+    result = embedding(passage_sentences)
+    embedding.cache = None
+
+    np.testing.assert_allclose(result, expected, atol=1e-6)
+
+
+def test_custom_models_do_not_share_cache(tiny_model, tiny_tokenizer, passage_sentences, tmp_path):
+    config = BertConfig(
+        vocab_size=tiny_tokenizer.vocab_size, hidden_size=16, num_hidden_layers=2,
+        num_attention_heads=2, intermediate_size=32, output_hidden_states=True,
+    )
+    cache = EmbeddingCache(str(tmp_path))
+    large = BertSummarizer(custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, embedding_cache=cache)
+    small = BertSummarizer(custom_model=BertModel(config), custom_tokenizer=tiny_tokenizer, embedding_cache=cache)
+
+    assert large.embedding.model_id != small.embedding.model_id
+    assert large.embedding(passage_sentences).shape == (len(passage_sentences), 32)
+    assert small.embedding(passage_sentences).shape == (len(passage_sentences), 16)
+
+
+@pytest.fixture(scope='module')
+def tiny_distilbert(tiny_tokenizer):
+    config = DistilBertConfig(
+        vocab_size=tiny_tokenizer.vocab_size, dim=32, n_layers=4, n_heads=4, hidden_dim=64,
+        output_hidden_states=True,
+    )
+    return DistilBertModel(config)
+
+
+@pytest.fixture(scope='module')
+def tiny_architectures(tiny_model, tiny_distilbert, tiny_tokenizer):
+    sizes = dict(
+        vocab_size=tiny_tokenizer.vocab_size, hidden_size=32, num_hidden_layers=4, num_attention_heads=4,
+        intermediate_size=64, output_hidden_states=True,
+    )
+    return {
+        'bert': tiny_model,
+        'distilbert': tiny_distilbert,
+        'roberta': RobertaModel(RobertaConfig(**sizes)),
+        'electra': ElectraModel(ElectraConfig(embedding_size=16, **sizes)),
+        'longformer': LongformerModel(LongformerConfig(attention_window=4, **sizes)),
+    }
+
+
+@pytest.mark.parametrize('architecture', ['bert', 'distilbert', 'roberta', 'electra', 'longformer'])
+@pytest.mark.parametrize('hidden,reduce_option', [(-2, 'mean'), (1, 'max'), ([0, -3], 'mean'), (-2, 'reduce_last_4')])
+@pytest.mark.parametrize('batch_size', [None, 3])
+def test_truncated_matches_full(
+    tiny_architectures, tiny_tokenizer, passage_sentences, architecture, hidden, reduce_option, batch_size
+):
+    model = tiny_architectures[architecture]
+    full = BertEmbedding(None, custom_model=model, custom_tokenizer=tiny_tokenizer, batch_size=batch_size)
+    truncated = BertEmbedding(
+        None, custom_model=model, custom_tokenizer=tiny_tokenizer, batch_size=batch_size, truncate_layers=True
+    )
+
+    # Longformer layers need its own masks and window padding, so it runs the full forward pass.
+    assert (truncated._encoder_layers() is None) == (architecture == 'longformer')
+    np.testing.assert_allclose(
+        truncated(passage_sentences, hidden, reduce_option), full(passage_sentences, hidden, reduce_option), atol=1e-5
+    )
+
+
+def test_truncated_keeps_read_states(tiny_tokenizer, tiny_model, passage_sentences):
+    embedding = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, truncate_layers=True)
+    input_ids, attention_mask = embedding.tokenize_batch(passage_sentences)
+    hidden_states = embedding._hidden_states(input_ids, attention_mask, hidden=-2)
+
+    assert len(hidden_states) == 5
+    assert [i for i, state in enumerate(hidden_states) if state is not None] == [3]
+
+
+def test_quantized_embedding(tiny_model, tiny_tokenizer, passage_sentences):
+    embedding = BertEmbedding(
+        None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, quantize=True, quantize_check=passage_sentences
+    )
+    report = embedding.quantization_report
+
+    assert isinstance(tiny_model.encoder.layer[0].output.dense, torch.nn.Linear)
+    assert not isinstance(embedding.model.encoder.layer[0].output.dense, torch.nn.Linear)
+    assert embedding.device == torch.device('cpu')
+    assert report['sentences'] == len(passage_sentences)
+    assert report['min_cosine'] > 0.9
+    assert embedding(passage_sentences).shape == (len(passage_sentences), 32)
+
+
+def test_summarizer_quantizes_in_embedding(tiny_model, tiny_tokenizer, passage_sentences):
+    summarizer = BertSummarizer(
+        custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, reduce_option='max', quantize=True,
+        quantize_check=passage_sentences
+    )
+
+    assert summarizer.embedding.device == torch.device('cpu')
+    assert summarizer.embedding.model_id.endswith('|int8')
+    assert summarizer.quantization_report['sentences'] == len(passage_sentences)
+
+
+@pytest.mark.parametrize('hidden,reduce_option,hidden_concat', [
+    (-2, 'mean', False), (-1, 'max', False), ([-1, -2], 'mean', True), (-2, 'reduce_last_4', False),
+])
+def test_torchscript_backend_matches_eager(
+    embedding, tiny_model, tiny_tokenizer, passage_sentences, tmp_path, hidden, reduce_option, hidden_concat
+):
+    expected = embedding(passage_sentences, hidden, reduce_option, hidden_concat)
+    path = str(tmp_path / 'model.pt')
+
+    exported = BertEmbedding(
+        None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, backend='torchscript', backend_path=path
+    )
+    np.testing.assert_allclose(exported(passage_sentences, hidden, reduce_option, hidden_concat), expected, atol=1e-5)
+
+    loaded = BertEmbedding(
+        'bert-base-uncased', custom_tokenizer=tiny_tokenizer, backend='torchscript', backend_path=path
+    )
+    assert loaded.model is None
+    np.testing.assert_allclose(loaded(passage_sentences, hidden, reduce_option, hidden_concat), expected, atol=1e-5)
+
+
+def test_torchscript_artifact_without_model_name(embedding, tiny_model, tiny_tokenizer, passage_sentences, tmp_path):
+    path = str(tmp_path / 'model.pt')
+    exported = BertEmbedding(
+        None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, backend='torchscript', backend_path=path
+    )
+
+    loaded = BertEmbedding(None, custom_tokenizer=tiny_tokenizer, backend='torchscript', backend_path=path)
+    assert loaded.model is None
+    assert loaded.model_id == exported.model_id
+    np.testing.assert_allclose(loaded(passage_sentences), embedding(passage_sentences), atol=1e-5)
+
+
+def test_quantized_torchscript_artifact_reloads_quantized(tiny_model, tiny_tokenizer, passage_sentences, tmp_path):
+    path = str(tmp_path / 'model.pt')
+    exported = BertEmbedding(
+        None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, quantize=True,
+        quantize_check=passage_sentences, backend='torchscript', backend_path=path
+    )
+
+    for model in ['bert-base-uncased', None]:
+        loaded = BertEmbedding(model, custom_tokenizer=tiny_tokenizer, backend='torchscript', backend_path=path)
+
+        assert loaded.quantized and loaded.model_id.endswith('|int8')
+        assert loaded.model_id == exported.model_id
+        assert loaded.quantization_report == exported.quantization_report
+        assert loaded.device == torch.device('cpu')
+        np.testing.assert_allclose(loaded(passage_sentences), exported(passage_sentences), atol=1e-5)
+
+
+def test_fast_tokenizer_matches_slow(tiny_model, tiny_tokenizer, tiny_fast_tokenizer, passage_sentences):
+    slow = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer)
+    fast = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_fast_tokenizer, batch_size=3)
+
+    assert fast.tokenize_ids(passage_sentences) == slow.tokenize_ids(passage_sentences)
+    for a, b in zip(fast.tokenize_batch(passage_sentences), slow.tokenize_batch(passage_sentences)):
+        assert torch.equal(a, b)
+
+    np.testing.assert_allclose(fast(passage_sentences), slow(passage_sentences), atol=1e-5)
+
+
+def test_fast_tokenizer_without_pad_token(tiny_model, tiny_tokenizer, tiny_vocab, passage_sentences):
+    tokenizer = BertTokenizerFast(tiny_vocab)
+    tokenizer.pad_token = None
+    slow = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, batch_size=3)
+    fast = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tokenizer, batch_size=3)
+
+    assert fast.tokenizer.pad_token_id is None
+    np.testing.assert_allclose(fast(passage_sentences), slow(passage_sentences), atol=1e-5)
+
+
+def test_default_tokenizer_is_fast(tiny_model, tiny_tokenizer, tmp_path):
+    tiny_model.save_pretrained(tmp_path)
+    tiny_tokenizer.save_pretrained(tmp_path)
+
+    embedding = BertEmbedding(str(tmp_path), model_classes=BertEmbedding.MODELS['bert-base-uncased'])
+    assert embedding.tokenizer.is_fast
+    assert TransformerSummarizer('Bert', str(tmp_path)).embedding.tokenizer.is_fast
+
+
+@pytest.mark.parametrize('fast', [False, True])
+def test_long_sentences_are_truncated(tiny_model, tiny_tokenizer, tiny_fast_tokenizer, passage_sentences, fast):
+    tokenizer = tiny_fast_tokenizer if fast else tiny_tokenizer
+    embedding = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tokenizer)
+    long_sentence = ' '.join(passage_sentences * 30)
+
+    assert embedding.max_length == tiny_model.config.max_position_embeddings
+    assert embedding.tokenize_input(long_sentence).shape == (1, embedding.max_length)
+    assert embedding([long_sentence, passage_sentences[0]]).shape == (2, 32)
+
+    embedding.batch_size = 2
+    assert embedding([long_sentence, passage_sentences[0]]).shape == (2, 32)
+
+
+SPECS = [(-2, 'mean', False), ([-1, -2], 'max', False), ([-1, -2], 'mean', True), (-1, 'concat_last_4', False)]
+
+
+@pytest.mark.parametrize('batch_size,max_tokens', [(None, None), (3, None), (None, 40)])
+def test_create_matrices_matches_single_configs(tiny_model, tiny_tokenizer, passage_sentences, batch_size, max_tokens):
+    embedding = BertEmbedding(
+        None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, batch_size=batch_size, max_tokens=max_tokens,
+        truncate_layers=True
+    )
+    matrices = embedding.create_matrices(passage_sentences, SPECS)
+
+    assert len(matrices) == len(SPECS)
+    for matrix, spec in zip(matrices, SPECS):
+        np.testing.assert_allclose(matrix, embedding(passage_sentences, *spec), atol=1e-5)
+
+
+def test_create_matrices_cached(tiny_model, tiny_tokenizer, passage_sentences, tmp_path):
+    cache = EmbeddingCache(str(tmp_path))
+    embedding = BertEmbedding(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer, cache=cache)
+    embedding.create_matrix(passage_sentences[:2], *SPECS[0])
+
+    first = embedding.create_matrices(passage_sentences, SPECS)
+    assert cache.stats()['entries'] == len(passage_sentences) * len(SPECS)
+
+    second = embedding.create_matrices(passage_sentences, SPECS)
+    for a, b in zip(first, second):
+        np.testing.assert_allclose(a, b)
+
+
+def test_summarizer_sessions(tiny_model, tiny_tokenizer, passage_sentences):
+    summarizer = BertSummarizer(None, custom_model=tiny_model, custom_tokenizer=tiny_tokenizer)
+    body = ' '.join(passage_sentences)
+    sessions = summarizer.sessions(body, SPECS, min_length=10)
+
+    assert len(sessions) == len(SPECS)
+    for session, spec in zip(sessions, SPECS):
+        np.testing.assert_allclose(session.embeddings, summarizer.embedding(session.sentences, *spec), atol=1e-5)
+        assert session.run(num_sentences=2)
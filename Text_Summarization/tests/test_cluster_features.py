@@ -0,0 +1,123 @@
+import numpy as np
+import pytest
+
+from summarizer.cluster_features import ClusterFeatures, CoresetKMeans
+from summarizer.projection import PCAProjection
+
+
+@pytest.fixture()
+def features():
+    return np.random.RandomState(7).rand(60, 16).astype(np.float32)
+
+
+def reference_closest_args(features, centroids):
+    args, used_idx = {}, []
+
+    for j, centroid in enumerate(centroids):
+        centroid_min, cur_arg = 1e10, -1
+
+        for i, feature in enumerate(features):
+            value = np.linalg.norm(feature - centroid)
+
+            if value < centroid_min and i not in used_idx:
+                cur_arg, centroid_min = i, value
+
+        used_idx.append(cur_arg)
+        args[j] = cur_arg
+
+    return args
+
+
+def test_greedy_assignment_matches_reference(features):
+    cluster_features = ClusterFeatures(features)
+    centroids = np.random.RandomState(3).rand(12, 16)
+    # duplicated centroids force the unique assignment to skip used sentences.
+    centroids = np.vstack([centroids, centroids[:4]])
+
+    result = cluster_features._ClusterFeatures__find_closest_args(centroids)
+    assert result == reference_closest_args(features, centroids)
+
+
+def test_optimal_assignment_is_unique_and_not_worse(features):
+    centroids = np.random.RandomState(3).rand(10, 16)
+    greedy = ClusterFeatures(features)
+    optimal = ClusterFeatures(features, assignment='optimal')
+
+    greedy_args = greedy._ClusterFeatures__find_closest_args(centroids)
+    optimal_args = optimal._ClusterFeatures__find_closest_args(centroids)
+    distances = greedy._distance_matrix(centroids)
+
+    assert len(set(optimal_args.values())) == len(centroids)
+    assert sum(distances[j, i] for j, i in optimal_args.items()) <= \
+        sum(distances[j, i] for j, i in greedy_args.items()) + 1e-9
+
+
+def test_cosine_cluster(features):
+    result = ClusterFeatures(features, metric='cosine').cluster(num_sentences=5)
+    assert len(result) == 5
+    assert result == sorted(set(result))
+
+
+@pytest.fixture()
+def blobs():
+    rng = np.random.RandomState(11)
+    centers = rng.rand(5, 16) * 20
+    return np.vstack([c + rng.rand(12, 16) for c in centers]).astype(np.float32)
+
+
+def test_parallel_elbow_matches_sequential(blobs):
+    cluster_features = ClusterFeatures(blobs)
+    assert cluster_features.calculate_elbow(12, n_jobs=2) == pytest.approx(cluster_features.calculate_elbow(12))
+
+
+def test_optimal_cluster_search_modes(blobs):
+    cluster_features = ClusterFeatures(blobs)
+    full = cluster_features.calculate_optimal_cluster(30)
+    early = cluster_features.search_elbow(30, patience=4)
+    warm = cluster_features.search_elbow(30, warm_start=True)
+
+    assert cluster_features.calculate_optimal_cluster(30, patience=4) == full
+    assert cluster_features.calculate_optimal_cluster(30, search='coarse', n_jobs=2) == full
+    assert max(early) < 29
+    assert list(warm) == list(range(1, 30))
+
+
+@pytest.mark.parametrize('algorithm', ['minibatch', 'coreset'])
+def test_approximate_kmeans_picks_one_sentence_per_blob(blobs, algorithm):
+    result = ClusterFeatures(blobs, algorithm).cluster(num_sentences=5)
+    assert sorted({i // 12 for i in result}) == list(range(5))
+    assert len(ClusterFeatures(blobs, algorithm).calculate_elbow(8)) == 7
+
+
+def test_coreset_samples_large_inputs(blobs):
+    model = CoresetKMeans(n_clusters=5, coreset_size=20).fit(blobs)
+    full = ClusterFeatures(blobs).search_elbow(6)[5]
+    assert model.inertia_ < 2 * full
+
+
+@pytest.mark.parametrize('covariance_type', [None, 'spherical', 'tied'])
+def test_fast_gmm_reduces_wide_features(covariance_type):
+    rng = np.random.RandomState(5)
+    centers = rng.rand(4, 1024) * 10
+    wide = np.vstack([c + rng.rand(10, 1024) for c in centers]).astype(np.float32)
+
+    cluster_features = ClusterFeatures(wide, 'fast_gmm', covariance_type=covariance_type)
+    result = cluster_features.cluster(num_sentences=4)
+
+    assert cluster_features.features.shape == (40, ClusterFeatures.auto_pca_k(40, 1024))
+    assert sorted({i // 10 for i in result}) == list(range(4))
+
+
+@pytest.mark.parametrize('method', ['randomized', 'incremental'])
+def test_reference_projection_round_trip(blobs, tmp_path, method):
+    projection = PCAProjection(4, method=method).fit_corpus([blobs[:30], blobs[30:]])
+    projection.save(str(tmp_path / 'projection.npz'))
+    loaded = PCAProjection.load(str(tmp_path / 'projection.npz'))
+
+    projected = loaded.transform(blobs)
+    assert projected.dtype == np.float32
+    np.testing.assert_allclose(projected, projection.transform(blobs), rtol=1e-6)
+
+    cluster_features = ClusterFeatures(blobs, projection=loaded)
+    assert cluster_features.features.shape == (60, 4)
+    assert sorted({i // 12 for i in cluster_features.cluster(num_sentences=5)}) == list(range(5))
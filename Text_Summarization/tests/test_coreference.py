@@ -1,6 +1,6 @@
 import pytest
 
-from summarizer.text_processors.coreference_handler import CoreferenceHandler
+from summarizer.text_processors.coreference_handler import CoreferenceHandler, _resolve_window
 
 
 @pytest.fixture()
@@ -13,3 +13,37 @@ def test_coreference_handler(coreference_handler):
     resolved = '''My sister has a dog. My sister loves a dog.'''
     result = coreference_handler.process(orig, min_length=2)
     assert ' '.join(result) == resolved
+
+
+def test_coreference_handler_windows():
+    orig = ' '.join(['My sister has a dog. She loves him.'] * 10)
+    whole = CoreferenceHandler().process(orig, min_length=2)
+    chunked = CoreferenceHandler(window_size=80, overlap=40)
+
+    assert len(chunked.windows(orig)) > 1
+    assert chunked.process(orig, min_length=2) == whole
+    assert list(chunked.spans(orig, min_length=2)) == whole
+
+
+def test_coreference_window_merged_with_context(coreference_handler):
+    # The core starts inside a sentence, as when spacy merges the last context sentence with the first core one.
+    # Only the core part of it is kept, the context part belongs to the previous window.
+    text = 'My sister has a dog and she loves him.'
+    whole = ''.join(_resolve_window(coreference_handler.nlp, text, 0))
+    core = ''.join(_resolve_window(coreference_handler.nlp, text, text.index('she')))
+
+    assert 'loves' in core and 'has' not in core
+    assert whole.endswith(core)
+
+
+def test_coreference_handler_reuses_pool():
+    orig = ' '.join(['My sister has a dog. She loves him.'] * 10)
+
+    with CoreferenceHandler(window_size=80, overlap=40, n_process=2) as handler:
+        first = handler.process(orig, min_length=2)
+        pool = handler._executor
+
+        assert handler.process(orig, min_length=2) == first
+        assert handler._executor is pool
+
+    assert handler._executor is None
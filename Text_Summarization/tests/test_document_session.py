@@ -0,0 +1,99 @@
+import numpy as np
+import pytest
+
+from summarizer.summary_processor import SummaryProcessor
+from summarizer.text_processors.sentence_handler import SentenceHandler
+
+
+class CountingModel:
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, sentences):
+        self.calls += 1
+        rng = np.random.RandomState(len(sentences))
+        return rng.rand(len(sentences), 8).astype(np.float32)
+
+
+@pytest.fixture()
+def processor():
+    return SummaryProcessor(CountingModel(), SentenceHandler())
+
+
+@pytest.fixture()
+def passage():
+    return '''
+    The Chrysler Building, the famous art deco New York skyscraper, will be sold for a small fraction of its previous sales price.
+    The deal, first reported by The Real Deal, was for $150 million, according to a source familiar with the deal.
+    Mubadala, an Abu Dhabi investment fund, purchased 90% of the building for $800 million in 2008.
+    Real estate firm Tishman Speyer had owned the other 10%.
+    The buyer is RFR Holding, a New York real estate company.
+    Officials with Tishman and RFR did not immediately respond to a request for comments.
+    The building sold fairly quickly after being publicly placed on the market only two months ago.
+    The incentive to sell the building at such a huge loss was due to the soaring rent the owners pay to Cooper Union, a New York college, for the land under the building.
+    The rent is rising from $7.75 million last year to $32.5 million this year to $41 million in 2028.
+    While the building is an iconic landmark in the New York skyline, it is competing against newer office towers with large floor-to-ceiling windows and all the modern amenities.
+    '''
+
+
+def test_session_embeds_once(processor, passage):
+    session = processor.session(passage)
+    k = session.calculate_optimal_k(k_max=6)
+    session.calculate_elbow(k_max=6)
+    summaries = [session.run(ratio=r) for r in (0.2, 0.4, 0.6)]
+    session.run(num_sentences=k, return_as_list=True)
+    session.run_embeddings(num_sentences=3, aggregate='mean')
+
+    assert processor.model.calls == 1
+    assert all(summaries)
+
+
+def test_session_matches_processor(processor, passage):
+    session = processor.session(passage)
+    assert session.run(num_sentences=3) == processor.run(passage, num_sentences=3)
+    np.testing.assert_array_equal(session.run_embeddings(ratio=0.3), processor.run_embeddings(passage, ratio=0.3))
+
+
+def test_empty_session(processor):
+    session = processor.session('Too short.')
+    assert session.run() == ''
+    assert session.run_embeddings() is None
+    assert processor.model.calls == 0
+
+
+def test_pca_stage(passage):
+    processor = SummaryProcessor(CountingModel(), SentenceHandler(), pca_k='auto')
+    assert len(processor.run(passage, num_sentences=3, return_as_list=True)) == 3
+    assert processor.session(passage).calculate_optimal_k(k_max=6) >= 1
+
+
+class RowModel:
+    """Embeds every sentence on its own, so shared batches must not change the vectors."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self, sentences):
+        self.calls += 1
+        return np.asarray([np.random.RandomState(len(s)).rand(8) for s in sentences], dtype=np.float32)
+
+
+def test_batch_summaries_match_single_calls(passage):
+    processor = SummaryProcessor(RowModel(), SentenceHandler())
+    bodies = [passage, 'Too short.', passage.replace('Chrysler', 'Empire State'), passage]
+
+    expected = [processor.run(body, num_sentences=3) for body in bodies]
+    processor.model.calls = 0
+    result = processor.run_batch(bodies, num_sentences=3, n_workers=2, chunk_size=3)
+
+    assert result == expected
+    assert processor.model.calls == 2
+
+
+def test_run_spans_point_at_summary(processor, passage):
+    spans = processor.run_spans(passage, num_sentences=3)
+    summary = processor.run(passage, num_sentences=3, return_as_list=True)
+
+    assert [passage[start:end] for start, end in spans] == summary
+    assert processor.session(passage, use_spans=True).run(num_sentences=3, return_as_list=True) == summary
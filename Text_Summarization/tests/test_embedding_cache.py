@@ -0,0 +1,61 @@
+import numpy as np
+import pytest
+
+from summarizer.transformer_embeddings.embedding_cache import EmbeddingCache
+
+
+@pytest.fixture()
+def sentences():
+    return ['The deal was for $150 million.', 'The sale was handled by CBRE Group.', 'It is unclear when it closes.']
+
+
+def fake_model(calls):
+    def compute(batch):
+        calls.extend(batch)
+        return np.asarray([[len(s), i] for i, s in enumerate(batch)], dtype=np.float32)
+    return compute
+
+
+def test_only_misses_are_computed(tmp_path, sentences):
+    calls = []
+    cache = EmbeddingCache(str(tmp_path))
+
+    first = cache.embed('model|-2|mean|False', sentences[:2], fake_model(calls))
+    second = cache.embed('model|-2|mean|False', sentences, fake_model(calls))
+
+    assert calls == sentences[:2] + sentences[2:]
+    np.testing.assert_array_equal(second[:2], first)
+    assert cache.stats()['hits'] == 2
+    assert cache.stats()['misses'] == 3
+
+
+def test_namespaces_do_not_collide(tmp_path, sentences):
+    calls = []
+    cache = EmbeddingCache(str(tmp_path))
+    cache.embed('model|-2|mean|False', sentences, fake_model(calls))
+    cache.embed('model|-1|mean|False', sentences, fake_model(calls))
+    assert len(calls) == 2 * len(sentences)
+
+
+def test_persistence(tmp_path, sentences):
+    expected = EmbeddingCache(str(tmp_path)).embed('sbert|mini', sentences, fake_model([]))
+
+    calls = []
+    reopened = EmbeddingCache(str(tmp_path))
+    result = reopened.embed('sbert|mini', sentences, fake_model(calls))
+
+    assert calls == []
+    np.testing.assert_array_equal(result, expected)
+
+
+def test_eviction_bounds_size(tmp_path):
+    cache = EmbeddingCache(str(tmp_path), max_bytes=10 * 8)
+    batch = [f'sentence number {i}' for i in range(30)]
+    cache.embed('ns', batch, fake_model([]))
+
+    assert cache.stats()['bytes'] <= 10 * 8
+    assert cache.stats()['evictions'] > 0
+
+    found, missing = EmbeddingCache(str(tmp_path)).lookup('ns', batch)
+    assert len(found) == len(cache)
+    assert missing == list(range(30 - len(cache)))
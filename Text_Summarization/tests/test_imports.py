@@ -0,0 +1,20 @@
+import subprocess
+import sys
+
+
+def test_package_import_is_lazy():
+    script = (
+        "import sys, summarizer; "
+        "print(','.join(m for m in ('torch', 'transformers', 'sklearn', 'spacy') if m in sys.modules))"
+    )
+    result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True, check=True)
+    assert result.stdout.strip() == ''
+
+
+def test_lazy_attributes():
+    import summarizer
+    from summarizer.bert import Summarizer, TransformerSummarizer
+
+    assert summarizer.Summarizer is Summarizer
+    assert summarizer.TransformerSummarizer is TransformerSummarizer
+    assert 'Summarizer' in dir(summarizer)
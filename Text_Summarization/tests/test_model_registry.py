@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+import torch
+from transformers import BertConfig, BertModel, BertTokenizer
+
+from summarizer.bert import TransformerSummarizer
+from summarizer.transformer_embeddings.bert_embedding import BertEmbedding
+from summarizer.transformer_embeddings.model_registry import ModelRegistry
+
+
+@pytest.fixture(scope='module')
+def model_dir(tmp_path_factory):
+    path = tmp_path_factory.mktemp('tiny_bert')
+    vocab = ['[PAD]', '[UNK]', '[CLS]', '[SEP]', '[MASK]', 'the', 'deal', 'was', '.']
+    (path / 'vocab.txt').write_text('\n'.join(vocab))
+    BertTokenizer(str(path / 'vocab.txt')).save_pretrained(str(path))
+
+    config = BertConfig(
+        vocab_size=len(vocab), hidden_size=32, num_hidden_layers=2, num_attention_heads=4, intermediate_size=64,
+    )
+    BertModel(config).save_pretrained(str(path))
+    return str(path)
+
+
+def test_registry_shares_weights(model_dir):
+    registry = ModelRegistry()
+    classes = (BertModel, BertTokenizer)
+
+    first = BertEmbedding(model_dir, registry=registry, model_classes=classes)
+    second = BertEmbedding(model_dir, registry=registry, model_classes=classes)
+
+    assert first.model is second.model
+    assert first.tokenizer is second.tokenizer
+    assert registry.refcount(first.model) == 2
+    assert not first.model.training
+    assert not any(p.requires_grad for p in first.model.parameters())
+    np.testing.assert_allclose(first(['the deal was.']), second(['the deal was.']))
+
+    model = first.model
+    first.release()
+    assert registry.refcount(model) == 1
+    assert registry.unload() == 0
+
+    second.release()
+    assert registry.unload() == 2
+    assert len(registry) == 0
+
+
+def test_registry_keys_by_device_and_dtype(model_dir):
+    registry = ModelRegistry()
+    float_model = registry.acquire(BertModel, model_dir)
+    half_model = registry.acquire(BertModel, model_dir, dtype=torch.float16)
+
+    assert float_model is not half_model
+    assert half_model.dtype == torch.float16
+    assert registry.acquire(BertModel, model_dir, device='cpu') is float_model
+    assert registry.unload(half_model) == 0
+    assert registry.release(half_model) == 0
+    assert registry.unload(half_model) == 1
+    assert registry.unload(float_model, force=True) == 1
+
+
+def test_transformer_summarizer_uses_registry(model_dir):
+    registry = ModelRegistry()
+    first = TransformerSummarizer('Bert', model_dir, registry=registry)
+    second = TransformerSummarizer('Bert', model_dir, registry=registry, reduce_option='max')
+
+    assert first.embedding.model is second.embedding.model
+    first.release()
+    second.release()
+    assert registry.unload() == 2
+
+
+def test_registry_resolves_class_names(model_dir):
+    registry = ModelRegistry()
+    by_class = BertEmbedding(model_dir, registry=registry, model_classes=(BertModel, BertTokenizer))
+    by_name = BertEmbedding(model_dir, registry=registry, model_classes=('BertModel', 'BertTokenizer'))
+
+    assert by_name.model is by_class.model
+    assert by_name.tokenizer is by_class.tokenizer
+    by_class.release()
+    by_name.release()
+
+
+def test_registry_keys_by_loading_arguments(model_dir):
+    registry = ModelRegistry()
+    plain = registry.acquire(BertModel, model_dir)
+    embedding = BertEmbedding(model_dir, registry=registry, model_classes=(BertModel, BertTokenizer))
+
+    assert embedding.model is not plain
+    assert embedding.model.config.output_hidden_states
+    assert embedding(['the deal was.', 'the deal.']).shape == (2, 32)
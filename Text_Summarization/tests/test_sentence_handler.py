@@ -1,5 +1,7 @@
+import numpy as np
 import pytest
 
+from summarizer.text_processors.regex_sentence_handler import RegexSentenceHandler
 from summarizer.text_processors.sentence_handler import SentenceHandler
 
 
@@ -40,3 +42,47 @@ def test_sentence_splits_default(sentence_handler, passage):
     res = sentence_handler(passage)
     assert len(res) == 21
 
+
+def test_stream_matches_process(sentence_handler, passage):
+    bodies = [passage, 'Too short.', passage.upper()]
+    stream = sentence_handler.stream(iter(bodies), batch_size=2)
+
+    assert next(stream) == sentence_handler(passage)
+    assert list(stream) == [sentence_handler(body) for body in bodies[1:]]
+    assert sentence_handler.process_many(bodies, n_process=2) == [sentence_handler(body) for body in bodies]
+
+
+def test_spans_match_sentences(sentence_handler, passage):
+    spans = sentence_handler.spans(passage)
+
+    assert list(spans) == sentence_handler(passage)
+    assert spans.offsets.dtype == np.int64
+    assert spans.spans.shape == (21, 2)
+    assert spans[-1] == passage[spans.span(20)[0]:spans.span(20)[1]]
+
+
+def test_regex_handler_matches_spacy(sentence_handler, passage):
+    regex_handler = RegexSentenceHandler()
+
+    assert regex_handler(passage) == sentence_handler(passage)
+    assert regex_handler(passage, min_length=10, max_length=100) == sentence_handler(passage, 10, 100)
+    assert list(regex_handler.spans(passage)) == sentence_handler(passage)
+
+
+def test_regex_handler_abbreviations():
+    body = 'Mr. Smith moved to the U.S. in 1990. He said "Hi!" Then he left, e.g. for good.'
+    assert RegexSentenceHandler()(body, min_length=0) == [
+        'Mr. Smith moved to the U.S. in 1990.', 'He said "Hi!"', 'Then he left, e.g. for good.'
+    ]
+
+    body = 'The board simply said no. The company then moved to No. 5 Main Street.'
+    assert RegexSentenceHandler()(body, min_length=0) == [
+        'The board simply said no.', 'The company then moved to No. 5 Main Street.'
+    ]
+
+
+def test_default_handler_is_shared(passage):
+    handler = SentenceHandler.default()
+
+    assert SentenceHandler.default() is handler
+    assert handler(passage) == SentenceHandler()(passage)
@@ -1,15 +1,366 @@
+import time
+STARTED = time.perf_counter()
+
 import tkinter as tk
 from tkinter import ttk, scrolledtext, filedialog, messagebox
 import sys
 sys.path.append('./Text_Summarization')
-from chatbot.chatbot import Chatbot
+import gc
+import importlib
+import logging
+from collections import deque
+import os
 import threading
-from code_explainer.main import get_code_explanation, read_python_file
-from summarizer import Summarizer
+
+logger = logging.getLogger(__name__)
+
+# Tool backends are imported on first use, or by the background prefetch once the window is up
+CHATBOT_MODULE = 'chatbot.chatbot'
+CODE_EXPLAINER_MODULE = 'code_explainer.main'
+SUMMARIZER_MODULE = 'summarizer.bert' # The package itself is lazy, this module pulls in torch and transformers
+
+
+class LazyModules:
+    """Imports modules on first use and records how long each import took"""
+
+    def __init__(self):
+        self.modules = {}
+        self.timings = {}
+        self.errors = {}
+        self.locks = {} # One lock per module, so that loading a module does not wait for the import of another
+        self.lock = threading.Lock()
+
+    def load(self, name):
+        """Import a module, once. Blocks while the module is being imported by another thread."""
+        module = self.modules.get(name)
+        if module is not None:
+            return module
+
+        with self.lock:
+            lock = self.locks.setdefault(name, threading.Lock())
+        with lock:
+            if name not in self.modules:
+                start = time.perf_counter()
+                module = importlib.import_module(name)
+                self.timings[name] = time.perf_counter() - start
+                self.modules[name] = module
+            return self.modules[name]
+
+    def prefetch(self, names, on_done=None):
+        """Import modules in a background thread. Failures are recorded and raised again on first use."""
+        def load_all():
+            for name in names:
+                try:
+                    self.load(name)
+                except Exception as e:
+                    self.errors[name] = e
+            if on_done:
+                on_done()
+
+        threading.Thread(target=load_all, daemon=True).start()
+
+
+class WarmModel:
+    """Long-lived model that is loaded once in the background, shared by every request and unloaded when idle"""
+
+    def __init__(self, loader, idle_unload=None, on_status=None):
+        """
+        loader: callable building the model
+        idle_unload: seconds without use after which the model is unloaded, None to keep it loaded
+        on_status: callable receiving status text, called from worker threads
+        """
+        self.loader = loader
+        self.idle_unload = idle_unload
+        self.on_status = on_status
+        self.model = None
+        self.last_used = time.monotonic()
+        self.load_time = None
+        self.lock = threading.RLock()
+
+    def _set_status(self, status):
+        if self.on_status:
+            self.on_status(status)
+
+    def _load(self):
+        """Load the model if needed. Must be called with the lock held."""
+        if self.model is None:
+            self._set_status("Model: loading...")
+            try:
+                start = time.perf_counter()
+                self.model = self.loader()
+                self.load_time = time.perf_counter() - start
+            except Exception as e:
+                self._set_status(f"Model: failed to load ({e})")
+                raise
+            self._set_status("Model: ready")
+        return self.model
+
+    def prewarm(self, on_done=None):
+        """Load the model in a background thread. on_done is called from that thread once loading is over."""
+        def load():
+            with self.lock:
+                try:
+                    self._load()
+                except Exception:
+                    pass # Reported through the status, and retried on the next request
+                self.last_used = time.monotonic()
+            if on_done:
+                on_done()
+
+        threading.Thread(target=load, daemon=True).start()
+
+    def run(self, *args, **kwargs):
+        """Run the model, loading it first if it is not loaded. Requests are served one at a time."""
+        with self.lock:
+            model = self._load()
+            try:
+                return model(*args, **kwargs)
+            finally:
+                self.last_used = time.monotonic()
+
+    def unload_if_idle(self):
+        """Unload the model if it has not been used for idle_unload seconds. Returns whether it was unloaded."""
+        if self.idle_unload is None or self.model is None:
+            return False
+        if time.monotonic() - self.last_used < self.idle_unload:
+            return False
+        if not self.lock.acquire(blocking=False): # In use
+            return False
+        try:
+            # A request may have finished since the first check
+            if self.model is None or time.monotonic() - self.last_used < self.idle_unload:
+                return False
+            self.model = None
+            gc.collect()
+        finally:
+            self.lock.release()
+        self._set_status("Model: unloaded to free memory (reloads on next use)")
+        return True
+
+
+class Job:
+    """A background request of one of the tools"""
+
+    def __init__(self, tool, key, func, args):
+        self.tool = tool
+        self.key = key
+        self.func = func
+        self.args = args
+        self.callbacks = []
+        self.cancelled = False
+        self.result = None
+        self.error = None
+        self.submitted = time.monotonic()
+        self.started = None
+        self.finished = None
+
+    @property
+    def wait_time(self):
+        """Seconds spent queued"""
+        return (self.started or time.monotonic()) - self.submitted
+
+    @property
+    def run_time(self):
+        """Seconds spent running"""
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.monotonic()) - self.started
+
+
+class ChunkedWriter:
+    """Renders text into a Tk text widget a chunk at a time, so large payloads do not stall the main loop"""
+    CHUNK_SIZE = 2000
+    CHUNK_DELAY_MS = 1
+
+    def __init__(self, widget, chunk_size=CHUNK_SIZE, delay_ms=CHUNK_DELAY_MS):
+        """
+        widget: the text widget, it is kept disabled between chunks
+        chunk_size: number of characters inserted per main loop iteration
+        delay_ms: delay between two chunks
+        """
+        self.widget = widget
+        self.chunk_size = chunk_size
+        self.delay_ms = delay_ms
+        self.queue = deque()
+        self.pending = None
+
+    def write(self, text, tags=(), mark=None, follow=False, on_done=None):
+        """
+        Append text after everything already queued. The first chunk is inserted right away.
+        mark: name of a mark set where the text starts
+        follow: whether to scroll to the end after each chunk
+        on_done: called once the whole text is shown
+        """
+        chunks = [text[i:i + self.chunk_size] for i in range(0, len(text), self.chunk_size)] or ['']
+        for i, chunk in enumerate(chunks):
+            last = i == len(chunks) - 1
+            self.queue.append((chunk, tags, mark if i == 0 else None, follow, on_done if last else None))
+
+        if self.pending is None:
+            self._flush()
+
+    def replace(self, text, tags=()):
+        """Drop whatever is queued or shown and write text instead"""
+        self.clear()
+        self.write(text, tags)
+
+    def clear(self):
+        """Drop the queued chunks and empty the widget"""
+        if self.pending is not None:
+            self.widget.after_cancel(self.pending)
+            self.pending = None
+        self.queue.clear()
+
+        self.widget.config(state=tk.NORMAL)
+        self.widget.delete("1.0", tk.END)
+        self.widget.config(state=tk.DISABLED)
+
+    def _flush(self):
+        """Insert the next chunk and schedule the one after it"""
+        self.pending = None
+        chunk, tags, mark, follow, on_done = self.queue.popleft()
+
+        self.widget.config(state=tk.NORMAL)
+        if mark is not None:
+            self.widget.mark_set(mark, "end-1c")
+            self.widget.mark_gravity(mark, tk.LEFT) # Stays in front of the text inserted after it
+        self.widget.insert(tk.END, chunk, tags)
+        self.widget.config(state=tk.DISABLED)
+        if follow:
+            self.widget.see(tk.END)
+
+        if self.queue:
+            self.pending = self.widget.after(self.delay_ms, self._flush)
+        if on_done:
+            on_done()
+
+
+class JobExecutor:
+    """Runs the background jobs of the tools with a concurrency limit per tool"""
+
+    def __init__(self, limits=None, default_limit=1, call_soon=None, on_update=None):
+        """
+        limits: max number of running jobs per tool
+        default_limit: limit of the tools missing from limits
+        call_soon: callable scheduling a function on the UI thread, callbacks are run through it
+        on_update: callable receiving a tool name whenever its queue changes
+        """
+        self.limits = limits or {}
+        self.default_limit = default_limit
+        self.call_soon = call_soon or (lambda func, *args: func(*args))
+        self.on_update = on_update
+        self.queues = {}
+        self.running = {}
+        self.in_flight = {}
+        self.last_job = {}
+        self.lock = threading.Lock()
+
+    def submit(self, tool, func, *args, key=None, on_done=None, supersede=False):
+        """
+        Queue func(*args) as a job of the tool.
+        key: identifies identical requests, an identical job that is still queued or running is reused. Defaults to args.
+        on_done: callable receiving the job once it finished, on the UI thread. Not called for cancelled jobs.
+        supersede: cancel the queued and running jobs of the tool, their results are dropped.
+        """
+        key = (tool, args if key is None else key)
+        with self.lock:
+            job = self.in_flight.get(key)
+            if job is None:
+                if supersede:
+                    self._cancel_tool(tool)
+                job = Job(tool, key, func, args)
+                self.in_flight[key] = job
+                self.queues.setdefault(tool, []).append(job)
+            if on_done:
+                job.callbacks.append(on_done)
+            self._dispatch(tool)
+        self._notify(tool)
+        return job
+
+    def cancel(self, job):
+        """Cancel a job. A queued job is dropped, a running job finishes but its result is discarded."""
+        with self.lock:
+            self._cancel(job)
+        self._notify(job.tool)
+
+    def _cancel_tool(self, tool):
+        for job in self.queues.get(tool, []) + list(self.running.get(tool, [])):
+            self._cancel(job)
+
+    def _cancel(self, job):
+        """Must be called with the lock held"""
+        job.cancelled = True
+        if self.in_flight.get(job.key) is job:
+            del self.in_flight[job.key]
+        if job in self.queues.get(job.tool, []):
+            self.queues[job.tool].remove(job)
+
+    def _dispatch(self, tool):
+        """Start queued jobs up to the limit of the tool. Must be called with the lock held."""
+        queue = self.queues.get(tool, [])
+        running = self.running.setdefault(tool, set())
+        while queue and len(running) < self.limits.get(tool, self.default_limit):
+            job = queue.pop(0)
+            running.add(job)
+            job.started = time.monotonic()
+            threading.Thread(target=self._run, args=(job,), daemon=True).start()
+
+    def _run(self, job):
+        try:
+            job.result = job.func(*job.args)
+        except Exception as e:
+            job.error = e
+        job.finished = time.monotonic()
+
+        with self.lock:
+            self.running[job.tool].discard(job)
+            if self.in_flight.get(job.key) is job:
+                del self.in_flight[job.key]
+            if not job.cancelled:
+                self.last_job[job.tool] = job
+            self._dispatch(job.tool)
+
+        if not job.cancelled:
+            for callback in job.callbacks:
+                self.call_soon(callback, job)
+        self._notify(job.tool)
+
+    def _notify(self, tool):
+        if self.on_update:
+            self.call_soon(self.on_update, tool)
+
+    def stats(self, tool):
+        """Queue depth and timing of a tool"""
+        with self.lock:
+            last = self.last_job.get(tool)
+            return {
+                'queued': len(self.queues.get(tool, [])),
+                'running': len(self.running.get(tool, ())),
+                'last_wait': last.wait_time if last else None,
+                'last_run': last.run_time if last else None,
+            }
+
 
 class AIToolsHub:
-    def __init__(self, root):
+    IDLE_CHECK_MS = 30000
+    CHAT_SCROLLBACK = 200 # Messages kept in the chat display, the full history stays in chat_history
+    CHAT_PAGE = 50 # Earlier messages loaded at a time when scrolling back to the top
+    JOB_LIMITS = {'chatbot': 1, 'code_explainer': 2, 'text_summarization': 1}
+
+    def __init__(self, root, summarizer_idle_unload=None, job_limits=None):
+        """
+        root: the Tk root window
+        summarizer_idle_unload: seconds without use after which the summarizer model is unloaded, None to keep it
+        job_limits: max number of concurrent background jobs per tool, defaults to JOB_LIMITS
+        """
         self.root = root
+        self.modules = LazyModules()
+        self.startup_timings = {}
+        self.chatbot = None
+        self.chatbot_lock = threading.Lock()
+        self.chat_history = [] # (sender, message) of every message, the display only shows the latest ones
+        self.chat_first = 0 # Index in chat_history of the first message shown
+        self.chat_loading = False
         self.root.title("AI Toolkit")
         self.root.geometry("1000x700")
         
@@ -58,6 +409,14 @@ class AIToolsHub:
         self.main_container = ttk.Frame(root)
         self.main_container.pack(fill=tk.BOTH, expand=True)
         
+        # Background jobs of the tools, results are handed back on the Tk main thread
+        self.jobs = JobExecutor(
+            limits=job_limits or self.JOB_LIMITS,
+            call_soon=lambda func, *args: self.root.after(0, func, *args),
+            on_update=self._update_job_status
+        )
+        self.job_status = {}
+
         # Create frames for different tools
         self.frames = {}
         
@@ -83,7 +442,68 @@ class AIToolsHub:
         
         # Show home frame initially
         self.show_frame('home')
+
+        # The summarizer model is reused by every request, it is pre-warmed by the background prefetch
+        self.summarizer = WarmModel(
+            lambda: self.modules.load(SUMMARIZER_MODULE).Summarizer(),
+            idle_unload=summarizer_idle_unload,
+            on_status=lambda status: self.root.after(0, self.summarizer_status.config, {'text': status})
+        )
+        self.root.after(self.IDLE_CHECK_MS, self._check_idle_models)
+
+        # Import the tool backends once the window is up
+        self.startup_timings['window'] = time.perf_counter() - STARTED
+        self.root.after_idle(self._prefetch)
+
+    def _prefetch(self):
+        """Import the tool backends and pre-warm the summarizer in the background"""
+        self.startup_timings['first paint'] = time.perf_counter() - STARTED
+
+        def done():
+            self.summarizer.prewarm(on_done=lambda: logger.info(self.startup_report()))
+
+        self.modules.prefetch([CHATBOT_MODULE, CODE_EXPLAINER_MODULE, SUMMARIZER_MODULE], on_done=done)
+
+    def startup_report(self):
+        """Startup timing report, broken down per module"""
+        lines = ["Startup timings:"]
+        for phase, seconds in self.startup_timings.items():
+            lines.append(f"  {phase}: {seconds:.2f}s after start")
+        for name, seconds in self.modules.timings.items():
+            lines.append(f"  import {name}: {seconds:.2f}s")
+        for name, error in self.modules.errors.items():
+            lines.append(f"  import {name}: failed ({error})")
+        if self.summarizer.load_time is not None:
+            lines.append(f"  summarizer model: {self.summarizer.load_time:.2f}s")
+        return "\n".join(lines)
+
+    def get_chatbot(self):
+        """Create the chatbot and its client on first use"""
+        with self.chatbot_lock:
+            if self.chatbot is None:
+                self.chatbot = self.modules.load(CHATBOT_MODULE).Chatbot()
+            return self.chatbot
+
+    def _check_idle_models(self):
+        """Periodically give back the memory of models that have not been used for a while"""
+        self.summarizer.unload_if_idle()
+        self.root.after(self.IDLE_CHECK_MS, self._check_idle_models)
     
+    def create_job_status(self, frame, tool):
+        """Create the label reporting the queue depth and timing of a tool's jobs"""
+        self.job_status[tool] = ttk.Label(frame, text="", font=('Helvetica', 9), foreground=self.text_color)
+        self.job_status[tool].pack(pady=(0, 5))
+
+    def _update_job_status(self, tool):
+        label = self.job_status.get(tool)
+        if label is None:
+            return
+        stats = self.jobs.stats(tool)
+        parts = [f"Running: {stats['running']}", f"Queued: {stats['queued']}"]
+        if stats['last_run'] is not None:
+            parts.append(f"Last job: {stats['last_run']:.1f}s (waited {stats['last_wait']:.1f}s)")
+        label.config(text=" · ".join(parts))
+
     def create_home_frame(self):
         """Create the home page with tool selection buttons"""
         frame = self.frames['home']
@@ -205,9 +625,6 @@ class AIToolsHub:
         )
         title_label.pack(pady=10)
         
-        # Initialize chatbot
-        self.chatbot = Chatbot()
-        
         # Chat display area
         self.chat_display = scrolledtext.ScrolledText(
             frame,
@@ -219,7 +636,8 @@ class AIToolsHub:
             foreground=self.text_color
         )
         self.chat_display.pack(pady=15, padx=25, fill=tk.BOTH, expand=True)
-        self.chat_display.config(state=tk.DISABLED)
+        self.chat_display.config(state=tk.DISABLED, yscrollcommand=self._on_chat_scroll)
+        self.chat_writer = ChunkedWriter(self.chat_display)
         
         # Configure tags for chat messages
         self.chat_display.tag_configure('user', foreground='#0056b3', font=('Helvetica', 11, 'bold'), justify='right')
@@ -246,6 +664,8 @@ class AIToolsHub:
             command=self.send_message
         )
         send_button.pack(side=tk.RIGHT)
+
+        self.create_job_status(frame, 'chatbot')
         
         # Welcome message
         self.add_message("Assistant", "Hello! How can I help you today?")
@@ -305,6 +725,8 @@ class AIToolsHub:
             command=self.explain_code
         )
         explain_btn.pack(side=tk.LEFT, padx=5)
+
+        self.create_job_status(frame, 'code_explainer')
         
         # Explanation display
         self.explanation_display = scrolledtext.ScrolledText(
@@ -318,6 +740,7 @@ class AIToolsHub:
         )
         self.explanation_display.pack(pady=10, padx=25, fill=tk.BOTH, expand=True)
         self.explanation_display.config(state=tk.DISABLED)
+        self.explanation_writer = ChunkedWriter(self.explanation_display)
     
     def create_text_summarization_frame(self):
         """Create the text summarization interface"""
@@ -363,6 +786,11 @@ class AIToolsHub:
             command=self.summarize_text
         )
         summarize_btn.pack(pady=10)
+
+        # Model loading state
+        self.summarizer_status = ttk.Label(frame, text="Model: not loaded yet", font=('Helvetica', 10, 'italic'))
+        self.summarizer_status.pack()
+        self.create_job_status(frame, 'text_summarization')
         
         # Summary display
         self.summary_display = scrolledtext.ScrolledText(
@@ -376,20 +804,68 @@ class AIToolsHub:
         )
         self.summary_display.pack(pady=10, padx=20, fill=tk.BOTH, expand=True)
         self.summary_display.config(state=tk.DISABLED)
+        self.summary_writer = ChunkedWriter(self.summary_display)
+
+    def chat_tag(self, sender):
+        """Tag used to display a message of the given sender"""
+        if sender == "You":
+            return 'user'
+        if sender == "Assistant":
+            return 'assistant'
+        return 'system' # System messages or errors
 
     def add_message(self, sender, message):
-        """Add a message to the chat display with appropriate tags"""
+        """Add a message to the chat history and render it at the bottom of the chat display"""
+        index = len(self.chat_history)
+        self.chat_history.append((sender, message))
+
+        # Each message starts at a mark, so that old ones can be trimmed from the display
+        self.chat_writer.write(f"{message}\n", (self.chat_tag(sender),), mark=f"msg{index}", follow=True)
+        self.chat_writer.write("\n", follow=True, on_done=lambda: self._trim_chat(index)) # Spacing between bubbles
+
+    def _trim_chat(self, last):
+        """Remove the oldest messages from the display, keeping CHAT_SCROLLBACK messages up to the last one"""
+        first = last + 1 - self.CHAT_SCROLLBACK
+        if first <= self.chat_first:
+            return
+
         self.chat_display.config(state=tk.NORMAL)
-        if sender == "You":
-            self.chat_display.insert(tk.END, f"{message}\n", 'user')
-        elif sender == "Assistant":
-            self.chat_display.insert(tk.END, f"{message}\n", 'assistant')
-        else: # System messages or errors
-            self.chat_display.insert(tk.END, f"{message}\n", 'system')
-        self.chat_display.insert(tk.END, "\n") # Add an extra newline for spacing between bubbles
-        
-        self.chat_display.see(tk.END)
+        self.chat_display.delete("1.0", f"msg{first}")
         self.chat_display.config(state=tk.DISABLED)
+        for index in range(self.chat_first, first):
+            self.chat_display.mark_unset(f"msg{index}")
+        self.chat_first = first
+
+    def _on_chat_scroll(self, first, last):
+        """Update the scrollbar, and bring back earlier messages when the top of the display is reached"""
+        self.chat_display.vbar.set(first, last)
+        if float(first) <= 0.0 and float(last) < 1.0 and self.chat_first > 0 and not self.chat_loading:
+            self.chat_loading = True
+            self.root.after_idle(self._load_earlier_messages)
+
+    def _load_earlier_messages(self):
+        """Render the previous CHAT_PAGE messages of the history above the ones shown"""
+        self.chat_loading = False
+        if self.chat_first == 0:
+            return
+
+        first = max(0, self.chat_first - self.CHAT_PAGE)
+        top = f"msg{self.chat_first}"
+
+        self.chat_display.config(state=tk.NORMAL)
+        self.chat_display.mark_gravity(top, tk.RIGHT) # Moves after each message inserted in front of it
+        for index in range(first, self.chat_first):
+            sender, message = self.chat_history[index]
+            position = self.chat_display.index(top)
+            self.chat_display.mark_set(f"msg{index}", position)
+            self.chat_display.mark_gravity(f"msg{index}", tk.LEFT)
+            self.chat_display.insert(position, f"{message}\n", self.chat_tag(sender), "\n")
+        self.chat_display.mark_gravity(top, tk.LEFT)
+        self.chat_display.config(state=tk.DISABLED)
+
+        # Keep the message that was at the top in view
+        self.chat_display.yview(top)
+        self.chat_first = first
     
     def send_message(self, event=None):
         """Send message and get response"""
@@ -406,30 +882,40 @@ class AIToolsHub:
         # Disable input while processing
         self.message_input.config(state=tk.DISABLED)
         
-        # Process message in a separate thread
-        threading.Thread(target=self.process_message, args=(message,), daemon=True).start()
+        # Process message in the background
+        self.jobs.submit('chatbot', self._chat, message, on_done=self.process_message)
+
+    def _chat(self, message):
+        return self.get_chatbot().generate_response(message)
     
-    def process_message(self, message):
-        """Process message and get response from chatbot"""
-        try:
-            response = self.chatbot.generate_response(message)
-            self.root.after(0, lambda: self.add_message("Assistant", response))
-        except Exception as e:
-            self.root.after(0, lambda: self.add_message("System", f"Error: {str(e)}"))
-        finally:
-            self.root.after(0, lambda: self.message_input.config(state=tk.NORMAL))
-            self.root.after(0, lambda: self.message_input.focus())
+    def process_message(self, job):
+        """Show the chatbot response of a finished job"""
+        if job.error is not None:
+            self.add_message("System", f"Error: {str(job.error)}")
+        else:
+            self.add_message("Assistant", job.result)
+        self.message_input.config(state=tk.NORMAL)
+        self.message_input.focus()
     
     def select_code_file(self):
         file_path = filedialog.askopenfilename(filetypes=[("Python Files", "*.py")])
         if not file_path:
             return
-        code = read_python_file(file_path)
-        if code is None:
+        # Reading goes through the job executor, the code explainer may still be importing
+        self.jobs.submit('code_file', self._read_code_file, file_path, on_done=self._read_code_file_done)
+
+    def _read_code_file(self, file_path):
+        return self.modules.load(CODE_EXPLAINER_MODULE).read_python_file(file_path)
+
+    def _read_code_file_done(self, job):
+        if job.error is not None:
+            messagebox.showerror("File Error", f"Could not read the file: {str(job.error)}")
+            return
+        if job.result is None:
             messagebox.showerror("Invalid File", "The selected file does not contain valid Python code.")
             return
         self.code_input.delete("1.0", tk.END)
-        self.code_input.insert(tk.END, code)
+        self.code_input.insert(tk.END, job.result)
     
     def explain_code(self):
         code = self.code_input.get("1.0", tk.END).strip()
@@ -437,25 +923,23 @@ class AIToolsHub:
             messagebox.showwarning("Input Error", "Please enter some code to explain or select a file.")
             return
 
-        self.explanation_display.config(state=tk.NORMAL)
-        self.explanation_display.delete("1.0", tk.END)
-        self.explanation_display.insert(tk.END, "Explaining code, please wait...")
-        self.explanation_display.config(state=tk.DISABLED)
+        self.explanation_writer.replace("Explaining code, please wait...")
 
-        threading.Thread(target=self._explain_code_thread, args=(code,)).start()
+        # A new request supersedes the previous one, identical requests share one job
+        self.jobs.submit('code_explainer', self._explain, code, on_done=self._explain_code_done, supersede=True)
 
-    def _explain_code_thread(self, code):
-        try:
-            explanation = get_code_explanation(code)
-            self.root.after(0, self._update_explanation_display, explanation)
-        except Exception as e:
-            self.root.after(0, self._update_explanation_display, f"Error: {str(e)}")
+    def _explain(self, code):
+        return self.modules.load(CODE_EXPLAINER_MODULE).get_code_explanation(code)
+
+    def _explain_code_done(self, job):
+        if job.error is not None:
+            self._update_explanation_display(f"Error: {str(job.error)}")
+        else:
+            self._update_explanation_display(job.result)
 
     def _update_explanation_display(self, explanation):
-        self.explanation_display.config(state=tk.NORMAL)
-        self.explanation_display.delete("1.0", tk.END)
-        self.explanation_display.insert(tk.END, explanation)
-        self.explanation_display.config(state=tk.DISABLED)
+        # Large explanations are rendered in chunks to keep the window responsive
+        self.explanation_writer.replace(explanation)
     
     def summarize_text(self):
         """Summarize the input text using the Summarizer model"""
@@ -464,26 +948,22 @@ class AIToolsHub:
             messagebox.showwarning("Input Error", "Please enter some text to summarize.")
             return
 
-        self.summary_display.config(state=tk.NORMAL)
-        self.summary_display.delete("1.0", tk.END)
-        self.summary_display.insert(tk.END, "Generating summary, please wait...")
-        self.summary_display.config(state=tk.DISABLED)
+        self.summary_writer.replace("Generating summary, please wait...")
 
-        threading.Thread(target=self._summarize_text_thread, args=(text,)).start()
+        # A new request supersedes the previous one, identical requests share one job
+        self.jobs.submit('text_summarization', self._summarize, text, on_done=self._summarize_done, supersede=True)
 
-    def _summarize_text_thread(self, text):
-        try:
-            model = Summarizer()
-            summary = model(text, ratio=0.3, min_length=30, max_length=150)
-            self.root.after(0, self._update_summary_display, summary)
-        except Exception as e:
-            self.root.after(0, self._update_summary_display, f"Error: {str(e)}")
+    def _summarize(self, text):
+        return self.summarizer.run(text, ratio=0.3, min_length=30, max_length=150)
+
+    def _summarize_done(self, job):
+        if job.error is not None:
+            self._update_summary_display(f"Error: {str(job.error)}")
+        else:
+            self._update_summary_display(job.result)
 
     def _update_summary_display(self, summary):
-        self.summary_display.config(state=tk.NORMAL)
-        self.summary_display.delete("1.0", tk.END)
-        self.summary_display.insert(tk.END, summary)
-        self.summary_display.config(state=tk.DISABLED)
+        self.summary_writer.replace(summary)
     
     def show_frame(self, frame_name):
         """Show the selected frame and hide others"""
@@ -504,6 +984,12 @@ class AIToolsHub:
                 command=lambda f=frame_name: self.show_frame(f)
             )
         
+        menu.add_separator()
+        menu.add_command(
+            label="Startup Report",
+            command=lambda: messagebox.showinfo("Startup Report", self.startup_report())
+        )
+        
         # Get the position of the menu button
         x = self.root.winfo_rootx() + 50
         y = self.root.winfo_rooty() + 50
@@ -512,8 +998,10 @@ class AIToolsHub:
         menu.post(x, y)
 
 def main():
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
     root = tk.Tk()
-    app = AIToolsHub(root)
+    idle_unload = os.getenv("SUMMARIZER_IDLE_UNLOAD") # Seconds, unset keeps the model loaded
+    app = AIToolsHub(root, summarizer_idle_unload=float(idle_unload) if idle_unload else None)
     root.mainloop()
 
 if __name__ == "__main__":